@@ -1,34 +1,177 @@
 1.1 
-def read_sales_data(filename):
+import bz2
+import gzip
+import lzma
+
+ENCODINGS = ['utf-8', 'latin-1', 'cp1252']
+
+
+def detect_encoding(sample, encodings=ENCODINGS):
     """
-    Reads sales data from file handling encoding issues
+    Picks the first encoding that can decode a sample of raw bytes
+
+    Args:
+        sample (bytes): Newline-aligned block of raw file data
+        encodings (list of str): Candidate encodings, in order of preference
 
     Returns:
-        list of strings (raw lines)
+        str or None: Name of the encoding, None if none of them fit
     """
 
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-
     for encoding in encodings:
         try:
-            with open(filename, 'r', encoding=encoding) as file:
-                lines = file.readlines()
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
 
-            data_lines = [
-                line.strip()
-                for line in lines[1:]
-                if line.strip()
-            ]
+    return None
 
-            return data_lines
 
-        except FileNotFoundError:
-            print(f"Error: File '{filename}' not found.")
-            return []
+# magic bytes -> opener for compressed inputs, decompressed as a stream
+COMPRESSION_MAGIC = {
+    b'\x1f\x8b': gzip.open,
+    b'BZh': bz2.open,
+    b'\xfd7zXZ\x00': lzma.open,
+}
 
-        except UnicodeDecodeError:
-          
-            continue
 
-    print("Error: Unable to read file due to encoding issues.")
-    return []
+def open_sales_file(filename):
+    """
+    Opens a sales file for binary reading
+
+    gzip, bz2 and xz files are recognised by their magic bytes and
+    decompressed on the fly, so they never need unpacking to disk.
+
+    Returns:
+        file object yielding the uncompressed bytes
+    """
+
+    with open(filename, 'rb') as file:
+        head = file.read(6)
+
+    for magic, opener in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return opener(filename, 'rb')
+
+    return open(filename, 'rb')
+
+
+def _iter_blocks(file, block_size):
+    """
+    Reads a binary file in blocks that always end on a newline
+
+    Yields:
+        bytes: Raw block of complete lines
+    """
+
+    remainder = b''
+
+    while True:
+        data = file.read(block_size)
+        if not data:
+            break
+
+        data = remainder + data
+        cut = data.rfind(b'\n') + 1
+        remainder = data[cut:]
+
+        if cut:
+            yield data[:cut]
+
+    if remainder:
+        yield remainder
+
+
+def iter_sales_data(filename, chunk_size=5000, block_size=1 << 20, info=None):
+    """
+    Streams sales data from file in bounded-size chunks
+
+    The file is read once as raw bytes. The encoding is detected from
+    the first block; any later block that does not decode with it falls
+    back to the next encoding that works, one block at a time.
+    Compressed inputs are decompressed on the fly (see open_sales_file).
+
+    Args:
+        filename (str): Path to the pipe-delimited sales file
+        chunk_size (int): Maximum number of lines per chunk
+        block_size (int): Number of bytes read from disk at a time
+        info (dict): Optional dict that receives 'encoding' (the
+            detected encoding) and 'fallback_blocks' (blocks decoded
+            with another encoding)
+
+    Yields:
+        list of strings (cleaned lines, header skipped)
+    """
+
+    if info is None:
+        info = {}
+
+    try:
+        file = open_sales_file(filename)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return
+
+    with file:
+        encoding = None
+        header_skipped = False
+        chunk = []
+
+        try:
+            for block in _iter_blocks(file, block_size):
+                if encoding is None:
+                    encoding = detect_encoding(block)
+                    if encoding is None:
+                        print("Error: Unable to read file due to encoding issues.")
+                        return
+                    info['encoding'] = encoding
+                    info['fallback_blocks'] = 0
+
+                try:
+                    text = block.decode(encoding)
+                except UnicodeDecodeError:
+                    fallback = detect_encoding(
+                        block, [enc for enc in ENCODINGS if enc != encoding]
+                    )
+                    if fallback is None:
+                        print("Error: Unable to read file due to encoding issues.")
+                        return
+                    text = block.decode(fallback)
+                    info['fallback_blocks'] += 1
+
+                lines = text.split('\n')
+                if not header_skipped:
+                    lines = lines[1:]
+                    header_skipped = True
+
+                for line in lines:
+                    line = line.strip()
+                    if line:
+                        chunk.append(line)
+
+                        if len(chunk) >= chunk_size:
+                            yield chunk
+                            chunk = []
+        except (OSError, EOFError, lzma.LZMAError) as e:
+            print(f"Error: Unable to decompress '{filename}': {e}")
+            return
+
+        if chunk:
+            yield chunk
+
+
+def read_sales_data(filename):
+    """
+    Reads sales data from file handling encoding issues
+
+    Returns:
+        list of strings (raw lines)
+    """
+
+    data_lines = []
+
+    for chunk in iter_sales_data(filename):
+        data_lines.extend(chunk)
+
+    return data_lines
@@ -1,12 +1,78 @@
 1.2 
-def parse_transactions(raw_lines):
+import sys
+from collections.abc import Mapping
+
+
+COLUMNS = (
+    'TransactionID', 'Date', 'ProductID', 'ProductName',
+    'Quantity', 'UnitPrice', 'CustomerID', 'Region'
+)
+
+
+class Transaction(Mapping):
     """
-    Parses raw sales transaction lines into a clean list of dictionaries.
+    One parsed transaction as a compact record.
+
+    Fields are slots (txn.region, txn.quantity, ...) and amount
+    (Quantity * UnitPrice) is computed once at parse time. The record
+    also reads like the dict it replaces: txn['Region'], txn.get(),
+    'Region' in txn, keys(), dict(txn), and equality with a dict.
+    """
+    __slots__ = ('transaction_id', 'date', 'product_id', 'product_name',
+                 'quantity', 'unit_price', 'customer_id', 'region', 'amount')
+
+    # dict key -> attribute name
+    FIELD_ATTRS = dict(zip(COLUMNS, __slots__))
+
+    def __init__(self, transaction_id, date, product_id, product_name,
+                 quantity, unit_price, customer_id, region):
+        self.transaction_id = transaction_id
+        self.date = date
+        self.product_id = product_id
+        self.product_name = product_name
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.customer_id = customer_id
+        self.region = region
+        self.amount = quantity * unit_price
+
+    def __getitem__(self, key):
+        return getattr(self, self.FIELD_ATTRS[key])
+
+    def get(self, key, default=None):
+        attr = self.FIELD_ATTRS.get(key)
+        return default if attr is None else getattr(self, attr)
+
+    def __contains__(self, key):
+        return key in self.FIELD_ATTRS
+
+    def __iter__(self):
+        return iter(COLUMNS)
+
+    def __len__(self):
+        return len(COLUMNS)
+
+    def __repr__(self):
+        return f"Transaction({dict(self)!r})"
+
+
+def parse_transactions(raw_lines, row_filter=None):
+    """
+    Parses raw sales transaction lines into a clean list of Transaction
+    records (dict-compatible, see Transaction).
+
+    Args:
+        raw_lines (iterable of str): Lines from read_sales_data(), or any
+            other iterable of lines, consumed lazily
+        row_filter (callable): Optional check (e.g. a TransactionFilter
+            from 1.3) called with the typed fields as a tuple in column
+            order; rows it rejects are dropped before a record is built
 
     Returns:
-        list: List of dictionaries with cleaned and typed values
+        list: List of Transaction records with cleaned and typed values
     """
     parsed_data = []
+    intern = sys.intern
 
     for line in raw_lines:
         fields = line.split('|')
@@ -34,18 +100,34 @@ def parse_transactions(raw_lines):
            
             continue
 
-        transaction = {
-            'TransactionID': transaction_id.strip(),
-            'Date': date.strip(),
-            'ProductID': product_id.strip(),
-            'ProductName': product_name.strip(),
-            'Quantity': quantity,
-            'UnitPrice': unit_price,
-            'CustomerID': customer_id.strip(),
-            'Region': region.strip()
-        }
+        # low-cardinality values are interned: every row shares one str per value
+        fields = (
+            transaction_id.strip(),
+            intern(date.strip()),
+            intern(product_id.strip()),
+            intern(product_name.strip()),
+            quantity,
+            unit_price,
+            intern(customer_id.strip()),
+            intern(region.strip())
+        )
+
+        if row_filter is not None and not row_filter(fields):
+            continue
+
+        transaction = Transaction(*fields)
 
         parsed_data.append(transaction)
 
     return parsed_data
 
+
+def iter_transactions(line_chunks, row_filter=None):
+    """
+    Parses a stream of line chunks (e.g. from iter_sales_data()).
+
+    Yields:
+        list: Parsed transactions for each chunk
+    """
+    for chunk in line_chunks:
+        yield parse_transactions(chunk, row_filter)
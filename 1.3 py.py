@@ -1,99 +1,226 @@
 1.3
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+from operator import attrgetter, itemgetter
+
+
+REQUIRED_FIELDS = [
+    'TransactionID', 'Date', 'ProductID', 'ProductName',
+    'Quantity', 'UnitPrice', 'CustomerID', 'Region'
+]
+
+
+class TransactionFilter:
+    """
+    Validation and the optional filters fused into one check per row.
+
+    The filter values are bound once into a closure (self.accept). It
+    takes a row as a tuple in REQUIRED_FIELDS order, computes the amount
+    once, and returns True if the row is kept. Each rejected row is
+    counted under the first rule it breaks: invalid, region, amount,
+    date, then ID prefix. That is the same order validate_and_filter()
+    has always applied them in.
+
+    Because accept() works on plain field tuples, it can be passed to a
+    parser (e.g. parse_transactions(lines, row_filter=f.accept)) so
+    rejected rows never become dicts.
+
+    Args:
+        region (str): Keep only this region
+        min_amount, max_amount (float): Keep amounts (Quantity * UnitPrice) in range
+        start_date, end_date (str): Keep dates in range, inclusive, YYYY-MM-DD
+        product_prefix, customer_prefix (str): Keep IDs starting with these
+    """
+
+    def __init__(self, region=None, min_amount=None, max_amount=None, start_date=None,
+                 end_date=None, product_prefix=None, customer_prefix=None):
+        self.region = region
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.start_date = start_date
+        self.end_date = end_date
+        self.product_prefix = product_prefix
+        self.customer_prefix = customer_prefix
+
+        self.rejected = {'invalid': 0, 'region': 0, 'amount': 0, 'date': 0, 'id': 0}
+        self.kept = [0]
+        self.regions = set()
+        self.amount_range = [None, None]
+        self.accept = self._compile()
+
+    def _compile(self):
+        region = self.region or None
+        min_amount, max_amount = self.min_amount, self.max_amount
+        start_date, end_date = self.start_date, self.end_date
+        product_prefix, customer_prefix = self.product_prefix, self.customer_prefix
+        rejected = self.rejected
+        regions = self.regions
+        amount_range = self.amount_range
+        kept = self.kept
+
+        def accept(fields):
+            transaction_id, date, product_id, _, quantity, unit_price, customer_id, row_region = fields
+
+            if (
+                quantity <= 0 or unit_price <= 0 or
+                not transaction_id.startswith('T') or
+                not product_id.startswith('P') or
+                not customer_id.startswith('C')
+            ):
+                rejected['invalid'] += 1
+                return False
+
+            amount = quantity * unit_price
+            regions.add(row_region)
+            if amount_range[0] is None or amount < amount_range[0]:
+                amount_range[0] = amount
+            if amount_range[1] is None or amount > amount_range[1]:
+                amount_range[1] = amount
+
+            if region is not None and row_region != region:
+                rejected['region'] += 1
+                return False
+            if (min_amount is not None and amount < min_amount) or \
+                    (max_amount is not None and amount > max_amount):
+                rejected['amount'] += 1
+                return False
+            if (start_date is not None and date < start_date) or \
+                    (end_date is not None and date > end_date):
+                rejected['date'] += 1
+                return False
+            if (product_prefix is not None and not product_id.startswith(product_prefix)) or \
+                    (customer_prefix is not None and not customer_id.startswith(customer_prefix)):
+                rejected['id'] += 1
+                return False
+            kept[0] += 1
+            return True
+
+        return accept
+
+    def __call__(self, fields):
+        return self.accept(fields)
+
+    @property
+    def total(self):
+        return self.kept[0] + sum(self.rejected.values())
+
+    def __getstate__(self):
+        # the compiled closure cannot be pickled; it is rebuilt on unpickling
+        state = self.__dict__.copy()
+        del state['accept']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.accept = self._compile()
+
+    def merge(self, other):
+        """Add the counts of a filter that checked another part of the data"""
+        self.kept[0] += other.kept[0]
+        for reason, count in other.rejected.items():
+            self.rejected[reason] += count
+        self.regions |= other.regions
+        for amount in other.amount_range:
+            if amount is None:
+                continue
+            if self.amount_range[0] is None or amount < self.amount_range[0]:
+                self.amount_range[0] = amount
+            if self.amount_range[1] is None or amount > self.amount_range[1]:
+                self.amount_range[1] = amount
+        return self
+
+    def summary(self):
+        """
+        Prints the regions and amount range of the valid rows and the
+        count left after each active filter
+
+        Returns:
+            dict: the filter_summary of validate_and_filter()
+        """
+
+        rejected = self.rejected
+
+        print("Available Regions:", sorted(self.regions))
+
+        if self.amount_range[0] is not None:
+            print(
+                f"Transaction Amount Range: "
+                f"Min = {self.amount_range[0]}, Max = {self.amount_range[1]}"
+            )
+
+        total = self.total
+        remaining = total - rejected['invalid']
+
+        remaining -= rejected['region']
+        if self.region:
+            print(f"After region filter ({self.region}): {remaining} records")
+
+        remaining -= rejected['amount']
+        if self.min_amount is not None or self.max_amount is not None:
+            print(f"After amount filter: {remaining} records")
+
+        remaining -= rejected['date']
+        if self.start_date is not None or self.end_date is not None:
+            print(f"After date filter: {remaining} records")
+
+        remaining -= rejected['id']
+        if self.product_prefix is not None or self.customer_prefix is not None:
+            print(f"After ID prefix filter: {remaining} records")
+
+        return {
+            'total_input': total,
+            'invalid': rejected['invalid'],
+            'filtered_by_region': rejected['region'],
+            'filtered_by_amount': rejected['amount'],
+            'filtered_by_date': rejected['date'],
+            'filtered_by_id': rejected['id'],
+            'final_count': remaining
+        }
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None,
+                        start_date=None, end_date=None, product_prefix=None,
+                        customer_prefix=None):
     """
     Validates transactions and applies optional filters.
 
+    All checks run in one pass through a TransactionFilter, so each
+    amount is computed once and no intermediate lists are built.
+
     Returns:
         tuple: (valid_transactions, invalid_count, filter_summary)
     """
 
-    valid_transactions = []
-    invalid_count = 0
+    row_filter = TransactionFilter(region, min_amount, max_amount, start_date,
+                                   end_date, product_prefix, customer_prefix)
+    accept = row_filter.accept
+    by_key = itemgetter(*REQUIRED_FIELDS)
+    # Transaction records (1.2) are read through their slots, which is
+    # much faster than their dict-style accessor
+    getters = {}
 
-    required_fields = [
-        'TransactionID', 'Date', 'ProductID', 'ProductName',
-        'Quantity', 'UnitPrice', 'CustomerID', 'Region'
-    ]
+    valid_transactions = []
+    missing_fields = 0
 
-    
-    
     for txn in transactions:
 
-        if not all(field in txn for field in required_fields):
-            invalid_count += 1
-            continue
-
-        if (
-            not txn['TransactionID'].startswith('T') or
-            not txn['ProductID'].startswith('P') or
-            not txn['CustomerID'].startswith('C')
-        ):
-            invalid_count += 1
-            continue
-
-        if txn['Quantity'] <= 0 or txn['UnitPrice'] <= 0:
-            invalid_count += 1
+        kind = type(txn)
+        row_fields = getters.get(kind)
+        if row_fields is None:
+            attrs = getattr(kind, 'FIELD_ATTRS', None)
+            row_fields = getters[kind] = (
+                attrgetter(*(attrs[field] for field in REQUIRED_FIELDS)) if attrs else by_key
+            )
+
+        try:
+            fields = row_fields(txn)
+        except KeyError:
+            missing_fields += 1
             continue
 
-        valid_transactions.append(txn)
-
-
-    summary = {
-        'total_input': len(transactions),
-        'invalid': invalid_count,
-        'filtered_by_region': 0,
-        'filtered_by_amount': 0,
-        'final_count': 0
-    }
-
-
- 
-    available_regions = sorted(
-        set(txn['Region'] for txn in valid_transactions)
-    )
-    print("Available Regions:", available_regions)
-
-
-    amounts = [
-        txn['Quantity'] * txn['UnitPrice']
-        for txn in valid_transactions
-    ]
-
-    if amounts:
-        print(
-            f"Transaction Amount Range: "
-            f"Min = {min(amounts)}, Max = {max(amounts)}"
-        )
-
-    if region:
-        before_count = len(valid_transactions)
-        valid_transactions = [
-            txn for txn in valid_transactions
-            if txn['Region'] == region
-        ]
-        summary['filtered_by_region'] = before_count - len(valid_transactions)
-        print(f"After region filter ({region}): {len(valid_transactions)} records")
-
-
-    if min_amount is not None or max_amount is not None:
-        before_count = len(valid_transactions)
-
-        filtered = []
-        for txn in valid_transactions:
-            amount = txn['Quantity'] * txn['UnitPrice']
-
-            if min_amount is not None and amount < min_amount:
-                continue
-            if max_amount is not None and amount > max_amount:
-                continue
-
-            filtered.append(txn)
-
-        valid_transactions = filtered
-        summary['filtered_by_amount'] = before_count - len(valid_transactions)
-        print(f"After amount filter: {len(valid_transactions)} records")
+        if accept(fields):
+            valid_transactions.append(txn)
 
-    summary['final_count'] = len(valid_transactions)
+    row_filter.rejected['invalid'] += missing_fields
 
-    return valid_transactions, invalid_count, summary
+    summary = row_filter.summary()
 
+    return valid_transactions, summary['invalid'], summary
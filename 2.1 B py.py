@@ -6,6 +6,7 @@ def region_wise_sales(transactions):
     Args:
         transactions (list of dict): Each dict must have keys:
             'region' and 'amount'
+            (or a TransactionTable, read column-wise)
 
     Returns:
         dict: Region-wise sales statistics sorted by total_sales (descending)
@@ -15,9 +16,36 @@ def region_wise_sales(transactions):
     grand_total = 0.0
 
    
-    for txn in transactions:
-        region = txn['region']
-        amount = float(txn['amount'])
+    if hasattr(transactions, 'column') and hasattr(transactions.column('Region'), 'codes'):
+        # dictionary-encoded Region: accumulate per integer code, name the groups at the end
+        regions = transactions.column('Region')
+        totals = [0.0] * len(regions.values)
+        counts = [0] * len(regions.values)
+        for code, quantity, price in zip(regions.codes,
+                                         transactions.column('Quantity'),
+                                         transactions.column('UnitPrice')):
+            amount = quantity * price
+            totals[code] += amount
+            counts[code] += 1
+            grand_total += amount
+        rows = ()
+        for region, total, count in zip(regions.values, totals, counts):
+            if count:
+                region_data[region] = {'total_sales': total, 'transaction_count': count}
+    elif hasattr(transactions, 'column'):
+        rows = (
+            (region, quantity * price)
+            for region, quantity, price in zip(
+                transactions.column('Region'),
+                transactions.column('Quantity'),
+                transactions.column('UnitPrice')
+            )
+        )
+    else:
+        rows = ((txn['region'], txn['amount']) for txn in transactions)
+
+    for region, amount in rows:
+        amount = float(amount)
 
         if region not in region_data:
             region_data[region] = {
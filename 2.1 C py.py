@@ -1,4 +1,7 @@
 2.1 
+import heapq
+
+
 def top_selling_products(transactions, n=5):
     """
     Finds top n products by total quantity sold
@@ -6,6 +9,7 @@ def top_selling_products(transactions, n=5):
     Args:
         transactions (list of dict): Each dict must have keys
             'product', 'quantity', 'price'
+            (or a TransactionTable, read column-wise)
         n (int): Number of top products to return
 
     Returns:
@@ -15,10 +19,19 @@ def top_selling_products(transactions, n=5):
 
     product_data = {}
 
-    for txn in transactions:
-        product = txn['product']
-        quantity = int(txn['quantity'])
-        price = float(txn['price'])
+    if hasattr(transactions, 'column'):
+        rows = zip(transactions.column('ProductName'),
+                   transactions.column('Quantity'),
+                   transactions.column('UnitPrice'))
+    else:
+        rows = (
+            (txn['product'], txn['quantity'], txn['price'])
+            for txn in transactions
+        )
+
+    for product, quantity, price in rows:
+        quantity = int(quantity)
+        price = float(price)
 
         if product not in product_data:
             product_data[product] = {
@@ -29,12 +42,12 @@ def top_selling_products(transactions, n=5):
         product_data[product]['total_quantity'] += quantity
         product_data[product]['total_revenue'] += quantity * price
 
-    result = [
+    result = (
         (product,
          data['total_quantity'],
          data['total_revenue'])
         for product, data in product_data.items()
-    ]
-    result.sort(key=lambda x: x[1], reverse=True)
+    )
 
-    return result[:n]
+    # bounded heap: O(p log n) instead of sorting every product
+    return heapq.nlargest(n, result, key=lambda x: x[1])
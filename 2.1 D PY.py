@@ -1,23 +1,64 @@
 2.1 
-def customer_analysis(transactions):
+import heapq
+
+
+def _customer_totals(transactions, distinct_counter=set):
     """
-    Analyzes customer purchase patterns
+    Accumulates spend, purchase count and products per customer
 
     Args:
-        transactions (list of dict): Each dict must have keys
-            'customer_id', 'product', 'quantity', 'price'
+        distinct_counter: Zero-argument factory for each customer's product
+            counter; set (exact) by default, or an approximate counter such
+            as 5.1's HyperLogLog.factory() (see script_loader.load_module)
 
     Returns:
-        dict: Customer-wise purchase statistics sorted by total_spent (descending)
+        dict: customer_id -> {'total_spent', 'purchase_count', 'products_bought' (counter)}
     """
 
     customer_data = {}
 
-    for txn in transactions:
-        customer = txn['customer_id']
-        product = txn['product']
-        quantity = int(txn['quantity'])
-        price = float(txn['price'])
+    if hasattr(transactions, 'column') and hasattr(transactions.column('CustomerID'), 'codes') \
+            and hasattr(transactions.column('ProductName'), 'codes'):
+        # dictionary-encoded columns: accumulate per integer code, name the groups at the end
+        customers = transactions.column('CustomerID')
+        products = transactions.column('ProductName')
+        spent = [0.0] * len(customers.values)
+        counts = [0] * len(customers.values)
+        bought = [distinct_counter() for _ in customers.values]
+        # exact sets hold product codes; other counters get the names
+        names = None if distinct_counter is set else products.values
+        for customer, product, quantity, price in zip(customers.codes, products.codes,
+                                                      transactions.column('Quantity'),
+                                                      transactions.column('UnitPrice')):
+            spent[customer] += quantity * price
+            counts[customer] += 1
+            bought[customer].add(product if names is None else names[product])
+
+        for customer, total, count, seen in zip(customers.values, spent, counts, bought):
+            if count:
+                customer_data[customer] = {
+                    'total_spent': total,
+                    'purchase_count': count,
+                    'products_bought': (
+                        {products.values[code] for code in seen} if names is None else seen
+                    )
+                }
+        return customer_data
+
+    if hasattr(transactions, 'column'):
+        rows = zip(transactions.column('CustomerID'),
+                   transactions.column('ProductName'),
+                   transactions.column('Quantity'),
+                   transactions.column('UnitPrice'))
+    else:
+        rows = (
+            (txn['customer_id'], txn['product'], txn['quantity'], txn['price'])
+            for txn in transactions
+        )
+
+    for customer, product, quantity, price in rows:
+        quantity = int(quantity)
+        price = float(price)
 
         amount = quantity * price
 
@@ -25,21 +66,52 @@ def customer_analysis(transactions):
             customer_data[customer] = {
                 'total_spent': 0.0,
                 'purchase_count': 0,
-                'products_bought': set()
+                'products_bought': distinct_counter()
             }
         customer_data[customer]['total_spent'] += amount
         customer_data[customer]['purchase_count'] += 1
         customer_data[customer]['products_bought'].add(product)
 
+    return customer_data
+
+
+def _finish_customer(data):
+    data['avg_order_value'] = round(
+        data['total_spent'] /
+        data['purchase_count'], 2
+    )
+    bought = data['products_bought']
+    if hasattr(bought, '__iter__'):
+        data['products_bought'] = list(bought)
+    else:
+        # approximate counters only know how many distinct products there were
+        del data['products_bought']
+        data['unique_products'] = len(bought)
+    return data
+
+
+def customer_analysis(transactions, distinct_counter=set):
+    """
+    Analyzes customer purchase patterns
+
+    Args:
+        transactions (list of dict): Each dict must have keys
+            'customer_id', 'product', 'quantity', 'price'
+            (or a TransactionTable, read column-wise)
+        distinct_counter: Factory for the per-customer product counter.
+            With the default (set) each customer gets 'products_bought';
+            with an approximate counter (e.g. 5.1's HyperLogLog.factory())
+            memory per customer is bounded and 'unique_products' replaces
+            the list.
+
+    Returns:
+        dict: Customer-wise purchase statistics sorted by total_spent (descending)
+    """
+
+    customer_data = _customer_totals(transactions, distinct_counter)
 
     for customer in customer_data:
-        customer_data[customer]['avg_order_value'] = round(
-            customer_data[customer]['total_spent'] /
-            customer_data[customer]['purchase_count'], 2
-        )
-        customer_data[customer]['products_bought'] = list(
-            customer_data[customer]['products_bought']
-        )
+        _finish_customer(customer_data[customer])
     sorted_customers = dict(
         sorted(
             customer_data.items(),
@@ -49,3 +121,55 @@ def customer_analysis(transactions):
     )
 
     return sorted_customers
+
+
+def top_customers(transactions, n=5, distinct_counter=set):
+    """
+    Finds the top n customers by total_spent using a bounded heap
+
+    Args:
+        transactions: Same input as customer_analysis()
+        n (int): Number of customers to return
+        distinct_counter: As in customer_analysis()
+
+    Returns:
+        dict: Statistics of the top n customers, sorted by total_spent (descending)
+    """
+
+    customer_data = _customer_totals(transactions, distinct_counter)
+
+    top = heapq.nlargest(
+        n,
+        customer_data.items(),
+        key=lambda x: x[1]['total_spent']
+    )
+
+    return {customer: _finish_customer(data) for customer, data in top}
+
+
+def iter_ranked_customers(transactions, distinct_counter=set):
+    """
+    Lazily yields customers from highest to lowest total_spent
+
+    The ranking is heapified once (O(n)) and each customer is popped
+    only when requested, so paging through the first results costs
+    O(k log n) instead of sorting every customer.
+
+    Args:
+        distinct_counter: As in customer_analysis()
+
+    Yields:
+        tuple: (customer_id, statistics dict as in customer_analysis())
+    """
+
+    customer_data = _customer_totals(transactions, distinct_counter)
+
+    heap = [
+        (-data['total_spent'], i, customer)
+        for i, (customer, data) in enumerate(customer_data.items())
+    ]
+    heapq.heapify(heap)
+
+    while heap:
+        _, _, customer = heapq.heappop(heap)
+        yield customer, _finish_customer(customer_data[customer])
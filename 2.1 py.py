@@ -6,6 +6,7 @@ def calculate_total_revenue(transactions):
     Args:
         transactions (list of dict): Each dict must have keys
             'quantity' and 'price'
+            (or a TransactionTable, read column-wise)
 
     Returns:
         float: Total revenue
@@ -13,9 +14,15 @@ def calculate_total_revenue(transactions):
 
     total_revenue = 0.0
 
-    for txn in transactions:
-        quantity = float(txn['quantity'])
-        price = float(txn['price'])
+    if hasattr(transactions, 'column'):
+        rows = zip(transactions.column('Quantity'),
+                   transactions.column('UnitPrice'))
+    else:
+        rows = ((txn['quantity'], txn['price']) for txn in transactions)
+
+    for quantity, price in rows:
+        quantity = float(quantity)
+        price = float(price)
         total_revenue += quantity * price
 
     return total_revenue
@@ -1,4 +1,184 @@
 2.2 
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from datetime import date, timedelta
+from itertools import accumulate
+
+
+class DateIndex:
+    """
+    Per-day revenue and transaction counts with prefix sums
+
+    Each distinct Date string is parsed once into a day ordinal. Only days
+    that have sales are stored, as sorted ordinals with their revenue,
+    counts and running totals, so a stray date such as 0001-01-01 or
+    9999-12-31 costs one entry rather than every day in between. After
+    the single build pass, with n days that have sales:
+
+        peak_day()               O(1)
+        day(d)                   O(log n), a bisect
+        range_total(start, end)  O(log n), a difference of two prefix sums
+        trend(period)            O(n), by day, week or month
+
+    Args:
+        transactions (list of dict): Each dict must have keys
+            'date', 'quantity', 'price'
+            (or a TransactionTable, read column-wise)
+    """
+
+    PERIODS = ('day', 'week', 'month')
+
+    def __init__(self, transactions):
+        daily = {}
+
+        if hasattr(transactions, 'column') and hasattr(transactions.column('Date'), 'codes'):
+            # dictionary-encoded dates: accumulate per integer code
+            dates = transactions.column('Date')
+            revenue = [0.0] * len(dates.values)
+            counts = [0] * len(dates.values)
+            for code, quantity, price in zip(dates.codes,
+                                             transactions.column('Quantity'),
+                                             transactions.column('UnitPrice')):
+                revenue[code] += quantity * price
+                counts[code] += 1
+            daily = {day: [total, count]
+                     for day, total, count in zip(dates.values, revenue, counts) if count}
+        else:
+            if hasattr(transactions, 'column'):
+                rows = zip(transactions.column('Date'),
+                           transactions.column('Quantity'),
+                           transactions.column('UnitPrice'))
+            else:
+                rows = (
+                    (txn['date'], txn['quantity'], txn['price'])
+                    for txn in transactions
+                )
+            for day, quantity, price in rows:
+                totals = daily.get(day)
+                if totals is None:
+                    totals = daily[day] = [0.0, 0]
+                totals[0] += int(quantity) * float(price)
+                totals[1] += 1
+
+        # parse every distinct date string once
+        by_ordinal = {}
+        self.skipped = 0
+        for day, (total, count) in daily.items():
+            try:
+                ordinal = date.fromisoformat(day).toordinal()
+            except (TypeError, ValueError):
+                self.skipped += count
+                continue
+            if ordinal in by_ordinal:
+                by_ordinal[ordinal][0] += total
+                by_ordinal[ordinal][1] += count
+            else:
+                by_ordinal[ordinal] = [total, count]
+        if self.skipped:
+            print(f"Warning: {self.skipped} transactions with unparseable dates left out of the index")
+
+        self.ordinals = sorted(by_ordinal)
+        self.revenue = [by_ordinal[ordinal][0] for ordinal in self.ordinals]
+        self.counts = [by_ordinal[ordinal][1] for ordinal in self.ordinals]
+
+        self.revenue_prefix = list(accumulate(self.revenue, initial=0.0))
+        self.count_prefix = list(accumulate(self.counts, initial=0))
+
+        # earliest day wins a tie
+        self.peak_offset = max(
+            range(len(self.ordinals)),
+            key=self.revenue.__getitem__,
+            default=None
+        )
+
+    @staticmethod
+    def _ordinal(day):
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        return day.toordinal()
+
+    def _name(self, offset):
+        return date.fromordinal(self.ordinals[offset]).isoformat()
+
+    def peak_day(self):
+        """
+        Returns:
+            tuple: (date, total_revenue, transaction_count) of the highest-revenue day
+        """
+        if self.peak_offset is None:
+            raise ValueError("no dated transactions to find a peak in")
+        i = self.peak_offset
+        return self._name(i), self.revenue[i], self.counts[i]
+
+    def day(self, day):
+        """
+        Returns:
+            tuple: (revenue, transaction_count) of one date ('YYYY-MM-DD' or datetime.date)
+        """
+        ordinal = self._ordinal(day)
+        i = bisect_left(self.ordinals, ordinal)
+        if i < len(self.ordinals) and self.ordinals[i] == ordinal:
+            return self.revenue[i], self.counts[i]
+        return 0.0, 0
+
+    def range_total(self, start=None, end=None):
+        """
+        Totals over an inclusive date range; None means the first/last day
+
+        Returns:
+            tuple: (revenue, transaction_count)
+        """
+        lo = 0 if start is None else bisect_left(self.ordinals, self._ordinal(start))
+        hi = len(self.ordinals) if end is None else bisect_right(self.ordinals, self._ordinal(end))
+        if lo >= hi:
+            return 0.0, 0
+        return (self.revenue_prefix[hi] - self.revenue_prefix[lo],
+                self.count_prefix[hi] - self.count_prefix[lo])
+
+    def trend(self, period='day'):
+        """
+        Revenue and transaction counts per day, week or month
+
+        Weeks start on Monday and are keyed by that date ('YYYY-MM-DD');
+        months are keyed 'YYYY-MM'. Buckets without sales are left out.
+
+        Returns:
+            dict: bucket -> {'revenue', 'transaction_count'}, in chronological order
+        """
+        if period not in self.PERIODS:
+            raise ValueError(f"period must be one of {self.PERIODS}, not {period!r}")
+
+        trend = {}
+        lo = 0
+        span = len(self.ordinals)
+
+        # walk the days with sales, closing a bucket at the first day past its end
+        while lo < span:
+            # bucket ends are ordinals, so a bucket at 9999-12-31 does not overflow date
+            day = date.fromordinal(self.ordinals[lo])
+            if period == 'month':
+                bucket = day.replace(day=1)
+                following = bucket.toordinal() + monthrange(bucket.year, bucket.month)[1]
+            elif period == 'week':
+                bucket = day - timedelta(days=day.weekday())
+                following = bucket.toordinal() + 7
+            else:
+                bucket = day
+                following = bucket.toordinal() + 1
+            hi = bisect_left(self.ordinals, following, lo)
+
+            key = bucket.isoformat()[:7] if period == 'month' else bucket.isoformat()
+            trend[key] = {
+                # single days are read directly, free of prefix-sum rounding
+                'revenue': (self.revenue[lo] if hi - lo == 1
+                            else self.revenue_prefix[hi] - self.revenue_prefix[lo]),
+                'transaction_count': self.count_prefix[hi] - self.count_prefix[lo]
+            }
+            lo = hi
+
+        return trend
+
+
 def find_peak_sales_day(transactions):
     """
     Identifies the date with highest revenue
@@ -6,17 +186,31 @@ def find_peak_sales_day(transactions):
     Args:
         transactions (list of dict): Each dict must have keys
             'date', 'quantity', 'price'
+            (or a TransactionTable, read column-wise, or a DateIndex
+            already built from them)
 
     Returns:
         tuple: (date, total_revenue, transaction_count)
     """
 
+    if isinstance(transactions, DateIndex):
+        return transactions.peak_day()
+
     daily_summary = {}
 
-    for txn in transactions:
-        date = txn['date']
-        quantity = int(txn['quantity'])
-        price = float(txn['price'])
+    if hasattr(transactions, 'column'):
+        rows = zip(transactions.column('Date'),
+                   transactions.column('Quantity'),
+                   transactions.column('UnitPrice'))
+    else:
+        rows = (
+            (txn['date'], txn['quantity'], txn['price'])
+            for txn in transactions
+        )
+
+    for date, quantity, price in rows:
+        quantity = int(quantity)
+        price = float(price)
 
         revenue = quantity * price
 
@@ -1,11 +1,16 @@
 2.2
-def daily_sales_trend(transactions):
+def daily_sales_trend(transactions, distinct_counter=set):
     """
     Analyzes sales trends by date
 
     Args:
         transactions (list of dict): Each dict must have keys
             'date', 'customer_id', 'quantity', 'price'
+            (or a TransactionTable, read column-wise)
+        distinct_counter: Zero-argument factory for the per-date customer
+            counter. The default (set) counts exactly; for fixed-size
+            approximate counts pass 5.1's HyperLogLog.factory(0.02), e.g.
+            script_loader.load_module('5.1 py.py').HyperLogLog.factory(0.02)
 
     Returns:
         dict: Date-wise sales statistics sorted chronologically
@@ -13,11 +18,46 @@ def daily_sales_trend(transactions):
 
     daily_data = {}
 
-    for txn in transactions:
-        date = txn['date']
-        customer = txn['customer_id']
-        quantity = int(txn['quantity'])
-        price = float(txn['price'])
+    if hasattr(transactions, 'column') and hasattr(transactions.column('Date'), 'codes') \
+            and hasattr(transactions.column('CustomerID'), 'codes'):
+        # dictionary-encoded columns: accumulate per integer code, name the days at the end
+        dates = transactions.column('Date')
+        revenue = [0.0] * len(dates.values)
+        counts = [0] * len(dates.values)
+        customers = [distinct_counter() for _ in dates.values]
+        # exact sets can hold the codes; sketches hash the IDs themselves
+        # so that they stay mergeable with sketches of other tables
+        customer_ids = None if distinct_counter is set else transactions.column('CustomerID').values
+        for date, customer, quantity, price in zip(dates.codes,
+                                                   transactions.column('CustomerID').codes,
+                                                   transactions.column('Quantity'),
+                                                   transactions.column('UnitPrice')):
+            revenue[date] += quantity * price
+            counts[date] += 1
+            customers[date].add(customer if customer_ids is None else customer_ids[customer])
+
+        for date, total, count, seen in zip(dates.values, revenue, counts, customers):
+            if count:
+                daily_data[date] = {
+                    'revenue': total,
+                    'transaction_count': count,
+                    'unique_customers': seen
+                }
+        rows = ()
+    elif hasattr(transactions, 'column'):
+        rows = zip(transactions.column('Date'),
+                   transactions.column('CustomerID'),
+                   transactions.column('Quantity'),
+                   transactions.column('UnitPrice'))
+    else:
+        rows = (
+            (txn['date'], txn['customer_id'], txn['quantity'], txn['price'])
+            for txn in transactions
+        )
+
+    for date, customer, quantity, price in rows:
+        quantity = int(quantity)
+        price = float(price)
 
         revenue = quantity * price
 
@@ -25,7 +65,7 @@ def daily_sales_trend(transactions):
             daily_data[date] = {
                 'revenue': 0.0,
                 'transaction_count': 0,
-                'unique_customers': set()
+                'unique_customers': distinct_counter()
             }
 
         daily_data[date]['revenue'] += revenue
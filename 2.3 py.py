@@ -6,6 +6,7 @@ def low_performing_products(transactions, threshold=10):
     Args:
         transactions (list of dict): Each dict must have keys
             'product', 'quantity', 'price'
+            (or a TransactionTable, read column-wise)
         threshold (int): Quantity threshold
 
     Returns:
@@ -15,10 +16,19 @@ def low_performing_products(transactions, threshold=10):
 
     product_data = {}
 
-    for txn in transactions:
-        product = txn['product']
-        quantity = int(txn['quantity'])
-        price = float(txn['price'])
+    if hasattr(transactions, 'column'):
+        rows = zip(transactions.column('ProductName'),
+                   transactions.column('Quantity'),
+                   transactions.column('UnitPrice'))
+    else:
+        rows = (
+            (txn['product'], txn['quantity'], txn['price'])
+            for txn in transactions
+        )
+
+    for product, quantity, price in rows:
+        quantity = int(quantity)
+        price = float(price)
 
         if product not in product_data:
             product_data[product] = {
@@ -1,9 +1,8 @@
 3 
 
-import requests
+from script_loader import load_module
 
-def get_all_products(limit=30):
-    response = requests.get('https://dummyjson.com/products')
-    data = response.json()
+catalog_cache = load_module('3.1  A  py.py')
 
-    return data['products'][:limit]
+# the first `limit` raw products of the cached catalog; see get_products() in 3.1 A
+get_all_products = catalog_cache.get_products
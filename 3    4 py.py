@@ -1,21 +1,153 @@
+import os
+import re
+from bisect import bisect_left
+
 import requests
 
-def search_products(query, limit=30):
+from script_loader import load_module
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+catalog_cache = load_module('3.1  A  py.py')
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class ProductSearchIndex:
+    """
+    In-memory inverted index over product title, description, category and brand.
+
+    Every query term is matched as a prefix of an indexed token (so
+    "lap" finds "laptops"), and a product must match all terms.
+    """
+
+    FIELDS = ('title', 'description', 'category', 'brand')
+
+    def __init__(self, products):
+        self.products = list(products)
+        self.postings = {}
+
+        for position, product in enumerate(self.products):
+            for field in self.FIELDS:
+                for token in tokenize(product.get(field)):
+                    self.postings.setdefault(token, set()).add(position)
+
+        self.tokens = sorted(self.postings)
+
+    def _prefix_matches(self, term):
+        """
+        Returns positions of products having a token that starts with term
+        """
+        matches = set()
+        i = bisect_left(self.tokens, term)
+        while i < len(self.tokens) and self.tokens[i].startswith(term):
+            matches |= self.postings[self.tokens[i]]
+            i += 1
+        return matches
+
+    def search(self, query, limit=30):
+        """
+        Args:
+            query (str): Search terms
+            limit (int): Maximum number of products to return
+
+        Returns:
+            list of dicts: Matching products in catalog order
+        """
+        terms = tokenize(query)
+        if not terms:
+            return self.products[:limit]
+
+        # start from the rarest term so the intersections stay small
+        candidates = sorted((self._prefix_matches(term) for term in terms), key=len)
+        result = candidates[0]
+        for matches in candidates[1:]:
+            result = result & matches
+            if not result:
+                return []
+
+        return [self.products[i] for i in sorted(result)[:limit]]
+
+
+_default_index = None
+_default_index_version = None
+# 'fetched_at' and 'base_url' of the catalog the index was built from
+_default_index_source = None
+
+
+def _catalog_index(ttl=None, base_url=None):
+    """
+    Returns a ProductSearchIndex over the cached catalog, or None if there is
+    no catalog younger than ttl seconds fetched from base_url (None skips a check)
+
+    The index is rebuilt only when the cache file changes, decided from
+    os.stat() (mtime and size); its age and API root are checked against
+    what the index was built from, so a query against an unchanged catalog
+    never reads the file.
+    """
+    global _default_index, _default_index_version, _default_index_source
+
+    try:
+        stat = os.stat(catalog_cache.CATALOG_CACHE_FILE)
+    except OSError:
+        return None
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    if _default_index is None or _default_index_version != version:
+        entry = catalog_cache.load_catalog_cache()
+        if entry is None:
+            return None
+        _default_index = ProductSearchIndex(entry['products'])
+        _default_index_version = version
+        _default_index_source = {'fetched_at': entry['fetched_at'], 'base_url': entry.get('base_url')}
+
+    if not catalog_cache.is_current(_default_index_source, ttl, base_url):
+        return None
+    return _default_index
+
+
+def search_products(query, limit=30, index=None, offline=False,
+                    ttl=catalog_cache.CATALOG_TTL, base_url=catalog_cache.API_BASE_URL):
     """
     Search products by keyword
 
+    Queries are answered from a local inverted index over the cached
+    catalog; the API search endpoint is only used when no catalog from
+    base_url younger than ttl is cached (and never when offline=True,
+    which accepts a cached catalog of any age).
+
     Args:
         query (str): Search term
         limit (int): Number of products to return (default 30)
+        index (ProductSearchIndex): Index to search instead of the cached catalog
+        offline (bool): Never call the API
+        ttl (int): Maximum age in seconds of a cached catalog to search
+        base_url (str): API root
 
     Returns:
         list of dicts: List of products matching the search
     """
-    url = "https://dummyjson.com/products/search"
+    if index is None:
+        index = _catalog_index(None if offline else ttl, base_url)
+    if index is not None:
+        return index.search(query, limit)
+    if offline:
+        print("Offline mode: no cached product catalog to search")
+        return []
+
+    url = f"{base_url.rstrip('/')}/products/search"
     params = {"q": query, "limit": limit}
 
     try:
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         return data["products"]
@@ -1,25 +1,7 @@
 3   
-import requests
+from script_loader import load_module
 
-def get_products(limit=30):
-    """
-    Fetches a specific number of products from DummyJSON.
+catalog_cache = load_module('3.1  A  py.py')
 
-    Args:
-        limit (int): Number of products to fetch
-
-    Returns:
-        list of dicts: List of product objects
-    """
-    url = "https://dummyjson.com/products"
-    params = {"limit": limit}
-
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  
-        data = response.json()
-        return data["products"]
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching products: {e}")
-        return []
+# the first `limit` raw products of the cached catalog; see get_products() in 3.1 A
+get_products = catalog_cache.get_products
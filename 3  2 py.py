@@ -1,8 +1,193 @@
 3 
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from script_loader import load_module
+
+catalog_cache = load_module('3.1  A  py.py')
+
+
+# {id: product} built from the catalog cache file, with the file's (mtime, size) it was built from
+_catalog_index = {'stat': None, 'base_url': None, 'fetched_at': None, 'products': {}}
+
+
+def _cached_catalog_index(ttl, offline, base_url):
+    """
+    Returns {id: product} from the catalog cache, or {} if it is missing,
+    stale or was fetched from another API root than base_url
+
+    The file is only read and indexed again when its mtime or size changes;
+    otherwise a lookup costs one os.stat().
+    """
+    try:
+        stat = os.stat(catalog_cache.CATALOG_CACHE_FILE)
+    except OSError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _catalog_index['stat'] != key:
+        entry = catalog_cache.load_catalog_cache()
+        _catalog_index.update(
+            stat=key,
+            base_url=entry.get('base_url') if entry else None,
+            fetched_at=entry['fetched_at'] if entry else None,
+            products={product.get('id'): product for product in entry['products']} if entry else {}
+        )
+    if catalog_cache.is_current(_catalog_index, None if offline else ttl, base_url):
+        return _catalog_index['products']
+    return {}
+
+
+class LRUCache:
+    """
+    Fixed-size mapping that evicts the least recently used entry.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+# Shared by get_product_by_id() and get_products_by_ids(); None marks an ID the API does not know
+product_cache = LRUCache()
+
+
+def _fetch_product(session, base_url, product_id):
+    """
+    GETs one product from the API (session may be the requests module itself)
+
+    Returns:
+        tuple: (product dict, or None for an unknown ID or a failed request,
+                whether the answer may be cached; failures are printed and not cached)
+    """
+    try:
+        response = session.get(f"{base_url}/products/{product_id}", timeout=10)
+        if response.status_code == 404:
+            return None, True
+        response.raise_for_status()
+        return response.json(), True
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching product {product_id}: {e}")
+        return None, False
+
+
+def get_product_by_id(product_id, ttl=catalog_cache.CATALOG_TTL, offline=False,
+                      base_url=catalog_cache.API_BASE_URL):
+    """
+    Looks up one product.
+
+    Served from the LRU cache or the cached catalog when possible;
+    otherwise the API is asked and the answer cached, as in
+    get_products_by_ids().
+
+    Args:
+        product_id (int): Product ID
+        ttl (int): Maximum age in seconds of a cached catalog to serve from
+        offline (bool): Never call the API
+        base_url (str): API root
+
+    Returns:
+        dict or None: The product, or None if it is not found or the request failed
+    """
+    base_url = base_url.rstrip('/')
+    if product_id in product_cache:
+        return product_cache.get(product_id)
+
+    product = _cached_catalog_index(ttl, offline, base_url).get(product_id)
+    if product is not None:
+        product_cache.put(product_id, product)
+        return product
+    if offline:
+        return None
+
+    product, cacheable = _fetch_product(requests, base_url, product_id)
+    if cacheable:
+        product_cache.put(product_id, product)
+    return product
+
+
+def get_products_by_ids(product_ids, max_concurrency=8, ttl=catalog_cache.CATALOG_TTL,
+                        offline=False, base_url=catalog_cache.API_BASE_URL):
+    """
+    Looks up many products at once.
+
+    IDs are deduplicated, then served from the LRU cache or the
+    cached catalog; only the remaining misses hit the API, at most
+    max_concurrency at a time over one pooled session.
+
+    Args:
+        product_ids (iterable): Product IDs, duplicates allowed
+        max_concurrency (int): Maximum number of requests in flight
+        ttl (int): Maximum age in seconds of a cached catalog to serve from
+        offline (bool): Never call the API
+        base_url (str): API root
+
+    Returns:
+        dict: product_id -> product dict (None if not found or the request failed)
+    """
+    base_url = base_url.rstrip('/')
+    results = {}
+    misses = []
+
+    for product_id in dict.fromkeys(product_ids):
+        if product_id in product_cache:
+            results[product_id] = product_cache.get(product_id)
+        else:
+            misses.append(product_id)
+
+    if misses:
+        catalog = _cached_catalog_index(ttl, offline, base_url)
+        remaining = []
+        for product_id in misses:
+            product = catalog.get(product_id)
+            if product is not None:
+                results[product_id] = product
+                product_cache.put(product_id, product)
+            else:
+                remaining.append(product_id)
+        misses = remaining
+
+    if misses and offline:
+        for product_id in misses:
+            results[product_id] = None
+        misses = []
+
+    if not misses:
+        return results
+
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        def fetch(product_id):
+            return (product_id,) + _fetch_product(session, base_url, product_id)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            for product_id, product, cacheable in pool.map(fetch, misses):
+                results[product_id] = product
+                if cacheable:
+                    product_cache.put(product_id, product)
 
-def get_product_by_id(product_id):
-    url = f"https://dummyjson.com/products/{product_id}"
-    response = requests.get(url)
-    response.raise_for_status()  
-    return response.json()
+    return results
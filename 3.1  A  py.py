@@ -1,9 +1,125 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE_URL = 'https://dummyjson.com'
+CATALOG_CACHE_FILE = 'data/product_catalog.json'
+CATALOG_TTL = 24 * 60 * 60
+
+
+def is_current(entry, ttl=None, base_url=None):
+    """
+    True if a catalog cache entry (or anything with its 'fetched_at' and
+    'base_url') is younger than ttl seconds and was fetched from base_url;
+    None skips that check
+    """
+    if entry is None or entry.get('fetched_at') is None:
+        return False
+    if base_url is not None and entry.get('base_url') != base_url.rstrip('/'):
+        return False
+    return ttl is None or time.time() - entry['fetched_at'] < ttl
+
+
+def load_catalog_cache(path=CATALOG_CACHE_FILE, base_url=None, ttl=None):
+    """
+    Reads the on-disk product catalog cache.
+
+    The other catalog scripts load this module and read the cache
+    through here rather than keeping their own copy.
+
+    Args:
+        path (str): Cache file
+        base_url (str): Only accept a catalog fetched from this API root
+            (None accepts any)
+        ttl (int): Only accept a catalog younger than this many seconds
+            (None accepts any age)
+
+    Returns:
+        dict or None: {'fetched_at', 'base_url', 'etag', 'last_modified', 'products'}
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if is_current(entry, ttl, base_url) else None
+
+
+def _save_catalog_cache(entry, path=CATALOG_CACHE_FILE):
+    """
+    Writes the catalog cache through a temp file so readers never see half of it.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def _fetch_catalog_pages(base_url, page_size, max_workers, headers):
+    """
+    Fetches every page of the catalog over one pooled session.
+
+    The first page reports the total count; the remaining pages are
+    fetched concurrently and put back in order.
 
-def fetch_all_products():
+    Returns:
+        tuple: (first page response, list of raw products or None on 304)
+    """
+    url = f"{base_url.rstrip('/')}/products"
+
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        first = session.get(
+            url, params={"limit": page_size, "skip": 0}, headers=headers, timeout=10
+        )
+        if first.status_code == 304:
+            return first, None
+        first.raise_for_status()
+
+        data = first.json()
+        products = data.get("products", [])
+        total = data.get("total", len(products))
+
+        def fetch_page(skip):
+            response = session.get(
+                url, params={"limit": page_size, "skip": skip}, timeout=10
+            )
+            response.raise_for_status()
+            return response.json().get("products", [])
+
+        skips = range(len(products), total, page_size) if products else []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for page in pool.map(fetch_page, skips):
+                products.extend(page)
+
+    return first, products
+
+
+def fetch_all_products(ttl=CATALOG_TTL, offline=False, base_url=API_BASE_URL,
+                       page_size=100, max_workers=8):
     """
     Fetches all products from DummyJSON API.
 
+    Reads through the on-disk catalog cache: a cache younger than ttl
+    seconds is used without any HTTP call, an older one is revalidated
+    with a conditional request (a 304 just refreshes its timestamp),
+    and offline=True only ever uses the cache.
+
+    Args:
+        ttl (int): Maximum age of the cached catalog in seconds
+        offline (bool): Never call the API
+        base_url (str): API root, e.g. a local stand-in server for tests
+        page_size (int): Products requested per page
+        max_workers (int): Pages fetched concurrently
+
     Returns:
         list of product dictionaries
         Format:
@@ -19,28 +135,88 @@ def fetch_all_products():
             ...
         ]
     """
-    url = "https://dummyjson.com/products"
-    params = {"limit": 100} 
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  
-        data = response.json()
-
-        products = [
-            {
-                "id": p.get("id"),
-                "title": p.get("title"),
-                "category": p.get("category"),
-                "brand": p.get("brand"),
-                "price": p.get("price"),
-                "rating": p.get("rating")
-            }
-            for p in data.get("products", [])
-        ]
+    entry = load_catalog_cache(base_url=base_url)
 
-        print(f"Success: Fetched {len(products)} products")
-        return products
+    if entry is not None and (offline or time.time() - entry['fetched_at'] < ttl):
+        raw_products = entry['products']
 
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to fetch products: {e}")
+    elif offline:
+        print("Offline mode: no cached product catalog")
         return []
+
+    else:
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response, raw_products = _fetch_catalog_pages(
+                base_url, page_size, max_workers, headers
+            )
+
+            if raw_products is None and entry is not None:
+                entry['fetched_at'] = time.time()
+                _save_catalog_cache(entry)
+                raw_products = entry['products']
+
+            else:
+                raw_products = raw_products or []
+                _save_catalog_cache({
+                    'fetched_at': time.time(),
+                    'base_url': base_url.rstrip('/'),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'products': raw_products
+                })
+
+        except requests.exceptions.RequestException as e:
+            if entry is None:
+                print(f"Failed to fetch products: {e}")
+                return []
+            print(f"Catalog refresh failed, using cached copy: {e}")
+            raw_products = entry['products']
+
+    products = [
+        {
+            "id": p.get("id"),
+            "title": p.get("title"),
+            "category": p.get("category"),
+            "brand": p.get("brand"),
+            "price": p.get("price"),
+            "rating": p.get("rating")
+        }
+        for p in raw_products
+    ]
+
+    print(f"Success: Fetched {len(products)} products")
+    return products
+
+
+def get_products(limit=30, ttl=CATALOG_TTL, offline=False, base_url=API_BASE_URL):
+    """
+    Returns the first limit raw products of the catalog, read through the cache
+
+    A missing or stale cache is refreshed with fetch_all_products(), which
+    downloads the whole catalog and writes the cache for every later caller.
+    This is get_all_products() in 3 1 and get_products() in 3 3.
+
+    Args:
+        limit (int): Number of products to return
+        ttl (int): Maximum age in seconds of a cached catalog to serve from
+        offline (bool): Only use the cached catalog
+        base_url (str): API root
+
+    Returns:
+        list of dicts: Raw product objects as the API returns them
+    """
+    entry = load_catalog_cache(base_url=base_url, ttl=None if offline else ttl)
+    if entry is None:
+        if offline:
+            return []
+        fetch_all_products(ttl, base_url=base_url)
+        entry = load_catalog_cache(base_url=base_url)
+
+    return entry['products'][:limit] if entry else []
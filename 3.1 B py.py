@@ -1,9 +1,16 @@
-def create_product_mapping(api_products):
+from script_loader import load_module
+
+
+catalog_cache = load_module('3.1  A  py.py')
+
+
+def create_product_mapping(api_products=None):
     """
     Creates a mapping of product IDs to product info
 
     Args:
-        api_products (list of dicts): Output from fetch_all_products()
+        api_products (list of dicts): Output from fetch_all_products();
+            when None, the cached catalog is used (no network call)
 
     Returns:
         dict: Mapping of product IDs to info
@@ -13,6 +20,10 @@ def create_product_mapping(api_products):
             2: {...},
         }
     """
+    if api_products is None:
+        entry = catalog_cache.load_catalog_cache()
+        api_products = entry['products'] if entry else []
+
     product_mapping = {}
 
     for product in api_products:
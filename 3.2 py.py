@@ -1,12 +1,20 @@
+import bz2
+import gzip
+import lzma
 import os
 
+# output file extension -> opener for compressed output
+COMPRESSED_SUFFIXES = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
 def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data.txt'):
     """
     Saves enriched transactions back to a pipe-delimited file.
 
     Args:
         enriched_transactions (list of dicts): Enriched transaction data
-        filename (str): Output file path
+        filename (str): Output file path; a .gz, .bz2 or .xz suffix writes
+            compressed output
 
     File Format:
         TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|API_Category|API_Brand|API_Rating|API_Match
@@ -22,7 +30,9 @@ def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data
         'API_Category', 'API_Brand', 'API_Rating', 'API_Match'
     ]
 
-    with open(filename, 'w', encoding='utf-8') as f:
+    opener = COMPRESSED_SUFFIXES.get(os.path.splitext(filename)[1].lower(), open)
+
+    with opener(filename, 'wt', encoding='utf-8') as f:
 
         f.write('|'.join(header) + '\n')
 
@@ -1,20 +1,196 @@
+import heapq
 import os
 from datetime import datetime
-from collections import defaultdict
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+
+REPORT_FIELDS = ('Date', 'ProductName', 'Quantity', 'UnitPrice', 'CustomerID', 'Region')
+
+
+def _report_fields(transactions):
+    """Iterates (date, product, quantity, price, customer, region) tuples from a list or a TransactionTable"""
+    if hasattr(transactions, 'column'):
+        return zip(*(transactions.column(name) for name in REPORT_FIELDS))
+    return (
+        (txn.get('Date', 'N/A'), txn.get('ProductName', 'Unknown'),
+         txn.get('Quantity', 0), txn.get('UnitPrice', 0),
+         txn.get('CustomerID', 'Unknown'), txn.get('Region', 'Unknown'))
+        for txn in transactions
+    )
+
+
+class SalesAggregator:
+    """
+    Computes every grouping used by the sales report in a single scan.
+
+    Partial aggregators (e.g. one per file or chunk) can be combined with merge().
+
+    Args:
+        distinct_counter: Zero-argument factory for the per-day customer
+            counter; set counts exactly, an approximate counter such as
+            5.1's HyperLogLog.factory() (see script_loader.load_module)
+            keeps memory fixed per day
+    """
+
+    def __init__(self, distinct_counter=set):
+        self.distinct_counter = distinct_counter
+        self.total_revenue = 0.0
+        self.total_transactions = 0
+        self.first_date = None
+        self.last_date = None
+        self.regions = {}
+        self.products = {}
+        self.customers = {}
+        self.daily = {}
+
+    def update(self, transactions):
+        """Adds transactions (list of dicts or TransactionTable) to the running totals"""
+        regions = self.regions
+        products = self.products
+        customers = self.customers
+        daily = self.daily
+        distinct_counter = self.distinct_counter
+        total_revenue = 0.0
+        count = 0
+        first_date = self.first_date
+        last_date = self.last_date
+
+        for date, name, qty, price, cid, region in _report_fields(transactions):
+            qty = int(qty)
+            revenue = float(price) * qty
+            total_revenue += revenue
+            count += 1
+
+            if first_date is None or date < first_date:
+                first_date = date
+            if last_date is None or date > last_date:
+                last_date = date
+
+            data = regions.get(region)
+            if data is None:
+                data = regions[region] = {'sales': 0.0, 'count': 0}
+            data['sales'] += revenue
+            data['count'] += 1
+
+            data = products.get(name)
+            if data is None:
+                data = products[name] = {'quantity': 0, 'revenue': 0.0}
+            data['quantity'] += qty
+            data['revenue'] += revenue
+
+            data = customers.get(cid)
+            if data is None:
+                data = customers[cid] = {'spent': 0.0, 'count': 0}
+            data['spent'] += revenue
+            data['count'] += 1
+
+            data = daily.get(date)
+            if data is None:
+                data = daily[date] = {'revenue': 0.0, 'transactions': 0, 'customers': distinct_counter()}
+            data['revenue'] += revenue
+            data['transactions'] += 1
+            data['customers'].add(cid)
+
+        self.total_revenue += total_revenue
+        self.total_transactions += count
+        self.first_date = first_date
+        self.last_date = last_date
+        return self
+
+    def merge(self, other):
+        """Folds another SalesAggregator into this one"""
+        self.total_revenue += other.total_revenue
+        self.total_transactions += other.total_transactions
+        for date in (other.first_date, other.last_date):
+            if date is None:
+                continue
+            if self.first_date is None or date < self.first_date:
+                self.first_date = date
+            if self.last_date is None or date > self.last_date:
+                self.last_date = date
+
+        for groups, other_groups in (
+            (self.regions, other.regions),
+            (self.products, other.products),
+            (self.customers, other.customers),
+            (self.daily, other.daily),
+        ):
+            for key, other_data in other_groups.items():
+                data = groups.get(key)
+                if data is None:
+                    groups[key] = {k: (v.copy() if hasattr(v, 'add') else v) for k, v in other_data.items()}
+                    continue
+                for k, v in other_data.items():
+                    if hasattr(v, 'add'):
+                        # distinct counters (sets or sketches) are unioned
+                        data[k] |= v
+                    else:
+                        data[k] += v
+        return self
+
+    def result(self):
+        """
+        Returns the aggregates consumed by generate_sales_report.
+
+        Returns:
+            dict: total_revenue, total_transactions, first_date, last_date
+            and the regions / products / customers / daily groupings
+        """
+        return {
+            'total_revenue': self.total_revenue,
+            'total_transactions': self.total_transactions,
+            'first_date': self.first_date,
+            'last_date': self.last_date,
+            'regions': self.regions,
+            'products': self.products,
+            'customers': self.customers,
+            'daily': {
+                date: {
+                    'revenue': data['revenue'],
+                    'transactions': data['transactions'],
+                    'unique_customers': len(data['customers'])
+                }
+                for date, data in self.daily.items()
+            }
+        }
+
+
+def aggregate_sales(transactions, distinct_counter=set):
+    """
+    Aggregates transactions for the sales report in one pass.
+
+    Args:
+        transactions (list of dicts or TransactionTable): Transaction data
+        distinct_counter: Factory for the per-day unique customer counts;
+            see SalesAggregator
+
+    Returns:
+        dict: See SalesAggregator.result()
+    """
+    return SalesAggregator(distinct_counter).update(transactions).result()
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt', aggregates=None,
+                          distinct_counter=set):
     """
     Generates a comprehensive formatted sales report and saves to file.
 
     Args:
-        transactions (list of dicts): Original transaction data
-        enriched_transactions (list of dicts): Transactions enriched with API info
+        transactions (list of dicts or TransactionTable): Original transaction data
+        enriched_transactions (list of dicts or TransactionTable): Transactions enriched with API info
         output_file (str): File path to save the report
+        aggregates (dict): Precomputed aggregate_sales() result; when given,
+            transactions is not scanned again
+        distinct_counter: Factory for the DAILY SALES TREND unique customer
+            counts; set is exact, an approximate counter (e.g.
+            5.1's HyperLogLog.factory()) bounds memory per day
     """
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
+    if aggregates is None:
+        aggregates = aggregate_sales(transactions, distinct_counter)
+
     report_lines = []
-    total_records = len(transactions)
+    total_records = aggregates['total_transactions']
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     report_lines.append("="*50)
@@ -24,12 +200,11 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
     report_lines.append("="*50)
     report_lines.append("")
 
-    total_revenue = sum(float(txn['UnitPrice']) * int(txn['Quantity']) for txn in transactions)
-    total_transactions = len(transactions)
+    total_revenue = aggregates['total_revenue']
+    total_transactions = aggregates['total_transactions']
     avg_order_value = total_revenue / total_transactions if total_transactions else 0
 
-    dates = sorted([txn['Date'] for txn in transactions])
-    date_range = f"{dates[0]} to {dates[-1]}" if dates else "N/A"
+    date_range = f"{aggregates['first_date']} to {aggregates['last_date']}" if total_transactions else "N/A"
 
     report_lines.append("OVERALL SUMMARY")
     report_lines.append("-"*50)
@@ -39,12 +214,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
     report_lines.append(f"Date Range:           {date_range}")
     report_lines.append("")
 
-    region_data = defaultdict(lambda: {'sales': 0.0, 'count': 0})
-    for txn in transactions:
-        region = txn.get('Region', 'Unknown')
-        region_data[region]['sales'] += float(txn['UnitPrice']) * int(txn['Quantity'])
-        region_data[region]['count'] += 1
-
+    region_data = aggregates['regions']
     total_sales = sum(r['sales'] for r in region_data.values())
 
     report_lines.append("REGION-WISE PERFORMANCE")
@@ -57,15 +227,8 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
 
     report_lines.append("")
 
-    product_data = defaultdict(lambda: {'quantity': 0, 'revenue': 0.0})
-    for txn in transactions:
-        name = txn.get('ProductName', 'Unknown')
-        qty = int(txn.get('Quantity', 0))
-        price = float(txn.get('UnitPrice', 0))
-        product_data[name]['quantity'] += qty
-        product_data[name]['revenue'] += qty * price
-
-    top_products = sorted(product_data.items(), key=lambda x: x[1]['quantity'], reverse=True)[:5]
+    product_data = aggregates['products']
+    top_products = heapq.nlargest(5, product_data.items(), key=lambda x: x[1]['quantity'])
 
     report_lines.append("TOP 5 PRODUCTS")
     report_lines.append("-"*50)
@@ -75,15 +238,8 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
 
     report_lines.append("")
 
-    customer_data = defaultdict(lambda: {'spent': 0.0, 'count': 0})
-    for txn in transactions:
-        cid = txn.get('CustomerID', 'Unknown')
-        qty = int(txn.get('Quantity', 0))
-        price = float(txn.get('UnitPrice', 0))
-        customer_data[cid]['spent'] += qty * price
-        customer_data[cid]['count'] += 1
-
-    top_customers = sorted(customer_data.items(), key=lambda x: x[1]['spent'], reverse=True)[:5]
+    customer_data = aggregates['customers']
+    top_customers = heapq.nlargest(5, customer_data.items(), key=lambda x: x[1]['spent'])
 
     report_lines.append("TOP 5 CUSTOMERS")
     report_lines.append("-"*50)
@@ -93,21 +249,14 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
 
     report_lines.append("")
 
-    daily_data = defaultdict(lambda: {'revenue': 0.0, 'transactions': 0, 'customers': set()})
-    for txn in transactions:
-        date = txn.get('Date', 'N/A')
-        qty = int(txn.get('Quantity', 0))
-        price = float(txn.get('UnitPrice', 0))
-        daily_data[date]['revenue'] += qty * price
-        daily_data[date]['transactions'] += 1
-        daily_data[date]['customers'].add(txn.get('CustomerID', 'Unknown'))
+    daily_data = aggregates['daily']
 
     report_lines.append("DAILY SALES TREND")
     report_lines.append("-"*50)
     report_lines.append(f"{'Date':<12}{'Revenue':>12}{'Transactions':>15}{'Unique Customers':>20}")
     for date in sorted(daily_data.keys()):
         data = daily_data[date]
-        report_lines.append(f"{date:<12}{data['revenue']:>12,.2f}{data['transactions']:>15}{len(data['customers']):>20}")
+        report_lines.append(f"{date:<12}{data['revenue']:>12,.2f}{data['transactions']:>15}{data['unique_customers']:>20}")
 
     report_lines.append("")
 
@@ -126,10 +275,24 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
         report_lines.append(f"  {region}: ₹{avg:,.2f}")
     report_lines.append("")
 
-    total_enriched = sum(1 for txn in enriched_transactions if txn.get('API_Match', False))
-    total_api_attempted = len(enriched_transactions)
+    total_enriched = 0
+    total_api_attempted = 0
+    failed_products = []
+    if hasattr(enriched_transactions, 'column'):
+        matches = zip(enriched_transactions.column('API_Match'),
+                      enriched_transactions.column('ProductID'))
+    else:
+        matches = (
+            (txn.get('API_Match', False), txn.get('ProductID', 'Unknown'))
+            for txn in enriched_transactions
+        )
+    for matched, product_id in matches:
+        total_api_attempted += 1
+        if matched:
+            total_enriched += 1
+        else:
+            failed_products.append(product_id)
     success_rate = (total_enriched / total_api_attempted * 100) if total_api_attempted else 0
-    failed_products = [txn.get('ProductID', 'Unknown') for txn in enriched_transactions if not txn.get('API_Match', False)]
 
     report_lines.append("API ENRICHMENT SUMMARY")
     report_lines.append("-"*50)
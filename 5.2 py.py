@@ -0,0 +1,416 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+from itertools import islice, repeat
+
+from script_loader import load_module
+
+# database column -> TransactionTable / dict field
+FIELDS = (
+    ('transaction_id', 'TransactionID'),
+    ('date', 'Date'),
+    ('product_id', 'ProductID'),
+    ('product_name', 'ProductName'),
+    ('quantity', 'Quantity'),
+    ('unit_price', 'UnitPrice'),
+    ('customer_id', 'CustomerID'),
+    ('region', 'Region'),
+    ('api_category', 'API_Category'),
+    ('api_brand', 'API_Brand'),
+    ('api_rating', 'API_Rating'),
+    ('api_match', 'API_Match'),
+)
+BASE_FIELDS = tuple(field for _, field in FIELDS[:8])
+ENRICHED_FIELDS = tuple(field for _, field in FIELDS[8:])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    loaded_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    transaction_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_price REAL NOT NULL,
+    customer_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    api_category TEXT,
+    api_brand TEXT,
+    api_rating REAL,
+    api_match INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_region ON transactions(region)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_product_id ON transactions(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_customer_id ON transactions(customer_id)",
+    # lets a changed file's old rows be deleted without a full scan
+    "CREATE INDEX IF NOT EXISTS idx_transactions_source ON transactions(source_id)",
+)
+
+INSERT = (f"INSERT INTO transactions (source_id, {', '.join(column for column, _ in FIELDS)}) "
+          f"VALUES ({', '.join('?' * (len(FIELDS) + 1))})")
+
+AMOUNT = "quantity * unit_price"
+
+
+def _rows(transactions):
+    """Row tuples in FIELDS order from a TransactionTable or a list of dicts, enriched or not"""
+    if hasattr(transactions, 'column'):
+        columns = [transactions.column(name) for name in BASE_FIELDS]
+        try:
+            columns += [transactions.column(name) for name in ENRICHED_FIELDS]
+        except KeyError:
+            columns += [repeat(None), repeat(None), repeat(None), repeat(False)]
+        return zip(*columns)
+    return (
+        tuple(txn[name] for name in BASE_FIELDS)
+        + (txn.get('API_Category'), txn.get('API_Brand'), txn.get('API_Rating'),
+           bool(txn.get('API_Match')))
+        for txn in transactions
+    )
+
+
+def _where(region=None, start_date=None, end_date=None, product_id=None, customer_id=None,
+           min_amount=None, max_amount=None):
+    """
+    Builds the WHERE clause shared by every query
+
+    Date, region, product and customer conditions are answered from their
+    indexes; the amount range is checked on the rows that remain.
+
+    Returns:
+        tuple: (sql, params); sql is '' when no filter is set
+    """
+    conditions = []
+    params = []
+    for sql, value in (
+        ("region = ?", region),
+        ("date >= ?", start_date),
+        ("date <= ?", end_date),
+        ("product_id = ?", product_id),
+        ("customer_id = ?", customer_id),
+        (f"{AMOUNT} >= ?", min_amount),
+        (f"{AMOUNT} <= ?", max_amount),
+    ):
+        if value is not None:
+            conditions.append(sql)
+            params.append(value)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+class SalesDatabase:
+    """
+    SQLite storage for validated (and optionally enriched) transactions.
+
+    Files are bulk-loaded once with batched executemany() inside a single
+    transaction per file; a file whose size and mtime have not changed is
+    not loaded again. The analytics methods return the same structures as
+    the 2.x functions and the 4.1 report aggregates, computed as indexed SQL
+    aggregations. Each takes the filters of _where(), so filtered reports
+    need no reparse.
+
+    Args:
+        path (str): Database file (created with its schema if missing)
+    """
+
+    def __init__(self, path='data/sales.db'):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def insert(self, transactions, source_id, batch_size=10000):
+        """
+        Inserts transactions in executemany() batches; the caller owns the transaction
+
+        Returns:
+            int: Number of rows inserted
+        """
+        rows = _rows(transactions)
+        count = 0
+        while True:
+            batch = [(source_id,) + row for row in islice(rows, batch_size)]
+            if not batch:
+                return count
+            self.conn.executemany(INSERT, batch)
+            count += len(batch)
+
+    def load_file(self, filename, product_mapping=None, reload=False, batch_size=10000):
+        """
+        Parses, validates, optionally enriches and stores one sales file
+
+        All of the file's rows, and the removal of rows from an earlier load of
+        the same file, are committed in one transaction; the indexes are
+        created after the first bulk insert. A reload that parses to no rows
+        keeps the earlier load's rows. Call analyze() once the batch of files
+        is loaded.
+
+        Args:
+            filename (str): Pipe-delimited sales file (compressed files work too)
+            product_mapping (dict): create_product_mapping() result; None skips enrichment
+            reload (bool): Load again even if the file is unchanged
+
+        Returns:
+            int: Rows stored (0 if the file was already loaded or could not be read)
+        """
+        m51 = load_module('5.1 py.py')
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            print(f"Error: File '{filename}' not found.")
+            return 0
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+        key = os.path.abspath(filename)
+
+        existing = self.conn.execute(
+            "SELECT id, fingerprint, rows FROM sources WHERE filename = ?", (key,)).fetchone()
+        if existing and existing[1] == fingerprint and not reload:
+            print(f"✓ '{filename}' is already loaded")
+            return 0
+
+        table = m51.load_transactions(filename, row_filter=m51.TransactionFilter())
+        if not len(table) and existing and existing[2]:
+            print(f"Warning: '{filename}' has no valid rows now; "
+                  f"keeping the {existing[2]} rows from its last load")
+            return 0
+        if product_mapping is not None:
+            table = m51.enrich_sales_data(table, product_mapping)
+
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            if existing:
+                source_id = existing[0]
+                self.conn.execute("DELETE FROM transactions WHERE source_id = ?", (source_id,))
+            else:
+                source_id = self.conn.execute(
+                    "INSERT INTO sources (filename, fingerprint, rows, loaded_at) VALUES (?, ?, 0, ?)",
+                    (key, fingerprint, now)).lastrowid
+            count = self.insert(table, source_id, batch_size)
+            self.conn.execute(
+                "UPDATE sources SET fingerprint = ?, rows = ?, loaded_at = ? WHERE id = ?",
+                (fingerprint, count, now, source_id))
+            for sql in INDEXES:
+                self.conn.execute(sql)
+        return count
+
+    def analyze(self):
+        """Refreshes the query planner's statistics; run once after loading, not per file"""
+        self.conn.execute("ANALYZE")
+
+    def _query(self, sql, filters, tail="", params=()):
+        where, where_params = _where(**filters)
+        return self.conn.execute(sql + where + tail, where_params + list(params))
+
+    def calculate_total_revenue(self, **filters):
+        """Total revenue, as 2.1 calculate_total_revenue()"""
+        return self._query(f"SELECT COALESCE(SUM({AMOUNT}), 0.0) FROM transactions",
+                           filters).fetchone()[0]
+
+    def region_wise_sales(self, **filters):
+        """Region-wise statistics sorted by total_sales, as 2.1 B region_wise_sales()"""
+        rows = self._query(f"SELECT region, SUM({AMOUNT}) AS sales, COUNT(*) FROM transactions",
+                           filters, " GROUP BY region ORDER BY sales DESC").fetchall()
+        grand_total = sum(sales for _, sales, _ in rows)
+        return {
+            region: {
+                'total_sales': sales,
+                'transaction_count': count,
+                'percentage': round(sales / grand_total * 100, 2) if grand_total else 0
+            }
+            for region, sales, count in rows
+        }
+
+    def top_selling_products(self, n=5, **filters):
+        """(ProductName, TotalQuantity, TotalRevenue) of the top n by quantity, as 2.1 C"""
+        return self._query(
+            f"SELECT product_name, SUM(quantity) AS units, SUM({AMOUNT}) FROM transactions",
+            filters, " GROUP BY product_name ORDER BY units DESC LIMIT ?", (n,)).fetchall()
+
+    def low_performing_products(self, threshold=10, **filters):
+        """Products with total quantity below threshold, ascending, as 2.3"""
+        return self._query(
+            f"SELECT product_name, SUM(quantity) AS units, SUM({AMOUNT}) FROM transactions",
+            filters, " GROUP BY product_name HAVING units < ? ORDER BY units", (threshold,)).fetchall()
+
+    def customer_analysis(self, n=None, **filters):
+        """
+        Customer-wise statistics sorted by total_spent, as 2.1 D customer_analysis()
+
+        Args:
+            n (int): Return only the top n customers (as 2.1 D top_customers())
+        """
+        tail = " GROUP BY customer_id ORDER BY spent DESC"
+        params = ()
+        if n is not None:
+            tail += " LIMIT ?"
+            params = (n,)
+        totals = self._query(f"SELECT customer_id, SUM({AMOUNT}) AS spent, COUNT(*) FROM transactions",
+                             filters, tail, params).fetchall()
+
+        products = {}
+        where, where_params = _where(**filters)
+        if n is not None and totals:
+            # only fetch the products of the customers being returned
+            where += (" AND " if where else " WHERE ") + \
+                f"customer_id IN ({', '.join('?' * len(totals))})"
+            where_params += [customer for customer, _, _ in totals]
+        for customer, product in self.conn.execute(
+                "SELECT DISTINCT customer_id, product_name FROM transactions" + where, where_params):
+            products.setdefault(customer, []).append(product)
+
+        return {
+            customer: {
+                'total_spent': spent,
+                'purchase_count': count,
+                'products_bought': products.get(customer, []),
+                'avg_order_value': round(spent / count, 2)
+            }
+            for customer, spent, count in totals
+        }
+
+    def daily_sales_trend(self, **filters):
+        """Date-wise revenue, transaction count and unique customers, as 2.2 daily_sales_trend()"""
+        return {
+            date: {'revenue': revenue, 'transaction_count': count, 'unique_customers': customers}
+            for date, revenue, count, customers in self._query(
+                f"SELECT date, SUM({AMOUNT}), COUNT(*), COUNT(DISTINCT customer_id) FROM transactions",
+                filters, " GROUP BY date ORDER BY date")
+        }
+
+    def find_peak_sales_day(self, **filters):
+        """(date, total_revenue, transaction_count) of the best day, as 2.2 B; None if empty"""
+        return self._query(
+            f"SELECT date, SUM({AMOUNT}) AS revenue, COUNT(*) FROM transactions",
+            filters, " GROUP BY date ORDER BY revenue DESC LIMIT 1").fetchone()
+
+    def report_aggregates(self, **filters):
+        """The 4.1 aggregate_sales() dict, for generate_sales_report(aggregates=...)"""
+        total_revenue, total_transactions, first_date, last_date = self._query(
+            f"SELECT COALESCE(SUM({AMOUNT}), 0.0), COUNT(*), MIN(date), MAX(date) FROM transactions",
+            filters).fetchone()
+
+        def grouped(key, select):
+            return self._query(f"SELECT {key}, {select} FROM transactions", filters,
+                               f" GROUP BY {key}").fetchall()
+
+        return {
+            'total_revenue': total_revenue,
+            'total_transactions': total_transactions,
+            'first_date': first_date,
+            'last_date': last_date,
+            'regions': {region: {'sales': sales, 'count': count}
+                        for region, sales, count in grouped('region', f"SUM({AMOUNT}), COUNT(*)")},
+            'products': {name: {'quantity': quantity, 'revenue': revenue}
+                         for name, quantity, revenue in grouped(
+                             'product_name', f"SUM(quantity), SUM({AMOUNT})")},
+            'customers': {customer: {'spent': spent, 'count': count}
+                          for customer, spent, count in grouped('customer_id', f"SUM({AMOUNT}), COUNT(*)")},
+            'daily': {date: {'revenue': revenue, 'transactions': count, 'unique_customers': customers}
+                      for date, revenue, count, customers in grouped(
+                          'date', f"SUM({AMOUNT}), COUNT(*), COUNT(DISTINCT customer_id)")},
+        }
+
+    def enrichment_matches(self, **filters):
+        """API_Match / ProductID per transaction, the enriched input of generate_sales_report()"""
+        return [{'API_Match': bool(matched), 'ProductID': product_id}
+                for matched, product_id in self._query(
+                    "SELECT api_match, product_id FROM transactions", filters)]
+
+    def generate_sales_report(self, output_file='output/sales_report.txt', **filters):
+        """Writes the 4.1 sales report for the (filtered) stored transactions"""
+        load_module('4.1 py.py').generate_sales_report(
+            None, self.enrichment_matches(**filters), output_file,
+            aggregates=self.report_aggregates(**filters))
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite storage and indexed analytics for sales data")
+    parser.add_argument('--db', default='data/sales.db', help="SQLite database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    load = commands.add_parser('load', help="bulk-load sales files into the database")
+    load.add_argument('source', help="sales file, or a directory / quoted glob of them")
+    load.add_argument('--reload', action='store_true', help="load files again even if unchanged")
+    load.add_argument('--no-enrich', action='store_true', help="skip the product API enrichment")
+    load.add_argument('--offline', action='store_true',
+                      help="use the cached product catalog only, never the network")
+    load.add_argument('--api-base-url', help="product API root")
+
+    for name, help_text in (('report', "write the sales report from the database"),
+                            ('query', "print one analytics result")):
+        command = commands.add_parser(name, help=help_text)
+        if name == 'report':
+            command.add_argument('--output', default='output/sales_report.txt')
+        else:
+            command.add_argument('analysis', choices=['revenue', 'regions', 'products', 'customers',
+                                                      'daily', 'peak', 'low'])
+            command.add_argument('-n', type=int, default=5, help="rows for products / customers")
+        command.add_argument('--region')
+        command.add_argument('--start-date', help="YYYY-MM-DD, inclusive")
+        command.add_argument('--end-date', help="YYYY-MM-DD, inclusive")
+        command.add_argument('--product-id')
+        command.add_argument('--customer-id')
+        command.add_argument('--min-amount', type=float)
+        command.add_argument('--max-amount', type=float)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    with SalesDatabase(args.db) as db:
+        if args.command == 'load':
+            m51 = load_module('5.1 py.py')
+            mapping = None
+            if not args.no_enrich:
+                catalog = m51.ProductCatalogCache(offline=args.offline,
+                                                  base_url=args.api_base_url or m51.API_BASE_URL)
+                mapping = m51.create_product_mapping(m51.fetch_all_products(catalog))
+            files = m51.expand_inputs(args.source) if m51.is_multi_file(args.source) else [args.source]
+            loaded = 0
+            for filename in files:
+                count = db.load_file(filename, mapping, args.reload)
+                if count:
+                    print(f"✓ Loaded {count} records from '{filename}'")
+                    loaded += 1
+            if loaded:
+                db.analyze()
+        else:
+            filters = {name: getattr(args, name) for name in (
+                'region', 'start_date', 'end_date', 'product_id', 'customer_id',
+                'min_amount', 'max_amount')}
+            if args.command == 'report':
+                db.generate_sales_report(args.output, **filters)
+            else:
+                print({
+                    'revenue': lambda: db.calculate_total_revenue(**filters),
+                    'regions': lambda: db.region_wise_sales(**filters),
+                    'products': lambda: db.top_selling_products(args.n, **filters),
+                    'customers': lambda: db.customer_analysis(args.n, **filters),
+                    'daily': lambda: db.daily_sales_trend(**filters),
+                    'peak': lambda: db.find_peak_sales_day(**filters),
+                    'low': lambda: db.low_performing_products(**filters),
+                }[args.analysis]())
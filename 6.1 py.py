@@ -0,0 +1,184 @@
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+
+HEADER = 'TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region'
+
+REGION_NAMES = ['North', 'South', 'East', 'West', 'Central',
+                'Northeast', 'Northwest', 'Southeast', 'Southwest', 'Islands']
+
+PRODUCT_NAMES = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Webcam', 'Headphones',
+                 'USB Cable', 'External Hard Drive', 'Laptop Charger', 'Phone Case',
+                 'Tablet', 'Smartwatch', 'Speaker', 'Router', 'Printer', 'Desk Lamp']
+
+CATEGORIES = ['laptops', 'smartphones', 'tablets', 'mobile-accessories', 'home-decoration']
+BRANDS = ['Apple', 'Samsung', 'Dell', 'Logitech', 'Lenovo', 'Asus', 'Sony', 'HP']
+
+# kinds of broken rows mixed in by generate_sales_data(); the first two are
+# dropped by parse_transactions, the last two by validate_and_filter
+MALFORMED_KINDS = ('fields', 'number', 'id', 'zero')
+
+
+def make_products(products=100, seed=42):
+    """
+    Builds a deterministic product list
+
+    Product numbers start at 101 (ProductID P101, P102, ...). Some names
+    contain a comma, as in the real exports, so the parser's cleanup is
+    exercised.
+
+    Returns:
+        list of dicts: id, name, price
+    """
+    rng = random.Random(f'products-{seed}')
+    result = []
+    for i in range(products):
+        base = PRODUCT_NAMES[i % len(PRODUCT_NAMES)]
+        series = i // len(PRODUCT_NAMES)
+        name = f"{base}, Series {series}" if rng.random() < 0.2 else f"{base} {series}"
+        result.append({
+            'id': 101 + i,
+            'name': name,
+            'price': round(rng.uniform(5, 80000), 2),
+        })
+    return result
+
+
+def generate_catalog(products=100, seed=42, missing=0.1):
+    """
+    Builds a DummyJSON-shaped catalog for the products of make_products()
+
+    A share of the products (missing) is left out so that the enrichment
+    "not matched" path is exercised too.
+
+    Returns:
+        list of dicts: id, title, category, brand, rating, price
+    """
+    rng = random.Random(f'catalog-{seed}')
+    catalog = []
+    for product in make_products(products, seed):
+        if rng.random() < missing:
+            continue
+        catalog.append({
+            'id': product['id'],
+            'title': product['name'],
+            'category': rng.choice(CATEGORIES),
+            'brand': rng.choice(BRANDS),
+            'rating': round(rng.uniform(1, 5), 2),
+            'price': product['price'],
+        })
+    return catalog
+
+
+def _skewed_weights(n):
+    """Cumulative Zipf-like weights, so a few customers/products dominate as in real sales"""
+    return list(accumulate(1.0 / (rank + 1) for rank in range(n)))
+
+
+def _malformed_line(rng, line):
+    """Corrupt one well-formed line in one of the MALFORMED_KINDS ways"""
+    fields = line.split('|')
+    kind = rng.choice(MALFORMED_KINDS)
+    if kind == 'fields':
+        del fields[rng.randrange(len(fields))]
+    elif kind == 'number':
+        fields[4] = 'two'
+    elif kind == 'id':
+        fields[0] = 'X' + fields[0][1:]
+    else:
+        fields[4] = '0'
+    return '|'.join(fields)
+
+
+def generate_sales_data(filename, rows=10000, customers=1000, products=100, regions=4,
+                        malformed=0.01, seed=42, start_date='2024-12-01', days=31,
+                        batch_size=10000):
+    """
+    Writes a deterministic pipe-delimited sales file
+
+    The same arguments always produce the same bytes, so benchmark runs on
+    different machines or commits see identical input.
+
+    Args:
+        filename (str): Output path
+        rows (int): Number of data lines (malformed ones included)
+        customers (int): Number of distinct CustomerIDs
+        products (int): Number of distinct ProductIDs (see make_products)
+        regions (int): Number of distinct regions (at most len(REGION_NAMES))
+        malformed (float): Share of lines that are broken (see MALFORMED_KINDS)
+        seed (int): Random seed
+        start_date (str): First date, YYYY-MM-DD
+        days (int): Number of consecutive dates used
+        batch_size (int): Lines generated and written per batch
+
+    Returns:
+        dict: filename, rows, malformed (number of broken lines)
+    """
+    if not 1 <= regions <= len(REGION_NAMES):
+        raise ValueError(f"regions must be between 1 and {len(REGION_NAMES)}")
+
+    rng = random.Random(seed)
+    first = date.fromisoformat(start_date)
+    dates = [(first + timedelta(days=i)).isoformat() for i in range(days)]
+    customer_ids = [f"C{i:06d}" for i in range(1, customers + 1)]
+    region_names = REGION_NAMES[:regions]
+    product_fields = [(f"P{p['id']}", p['name'], f"{p['price']:,.2f}")
+                      for p in make_products(products, seed)]
+    product_weights = _skewed_weights(len(product_fields))
+    customer_weights = _skewed_weights(len(customer_ids))
+    quantities = range(1, 11)
+
+    broken = 0
+    with open(filename, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(HEADER + '\n')
+        for start in range(0, rows, batch_size):
+            k = min(batch_size, rows - start)
+            picked_products = rng.choices(product_fields, cum_weights=product_weights, k=k)
+            picked_customers = rng.choices(customer_ids, cum_weights=customer_weights, k=k)
+            picked_dates = rng.choices(dates, k=k)
+            picked_regions = rng.choices(region_names, k=k)
+            picked_quantities = rng.choices(quantities, k=k)
+
+            lines = [
+                f"T{start + i + 1:08d}|{day}|{pid}|{name}|{qty}|{price}|{cid}|{region}"
+                for i, ((pid, name, price), cid, day, region, qty) in enumerate(zip(
+                    picked_products, picked_customers, picked_dates,
+                    picked_regions, picked_quantities))
+            ]
+            if malformed:
+                for i in range(k):
+                    if rng.random() < malformed:
+                        lines[i] = _malformed_line(rng, lines[i])
+                        broken += 1
+            f.write('\n'.join(lines) + '\n')
+
+    return {'filename': filename, 'rows': rows, 'malformed': broken}
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a deterministic sales data file")
+    parser.add_argument('filename', help="output pipe-delimited file")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--regions', type=int, default=4)
+    parser.add_argument('--malformed', type=float, default=0.01,
+                        help="share of broken lines (0-1)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--catalog', help="also write a matching DummyJSON-style catalog to this JSON file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    summary = generate_sales_data(args.filename, args.rows, args.customers, args.products,
+                                  args.regions, args.malformed, args.seed)
+    print(f"✓ Wrote {summary['rows']} rows ({summary['malformed']} malformed) to '{args.filename}'")
+    if args.catalog:
+        catalog = generate_catalog(args.products, args.seed)
+        with open(args.catalog, 'w', encoding='utf-8') as f:
+            json.dump({'products': catalog, 'total': len(catalog)}, f)
+        print(f"✓ Wrote {len(catalog)} catalog products to '{args.catalog}'")
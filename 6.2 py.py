@@ -0,0 +1,256 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from script_loader import load_module
+
+DEFAULT_SIZES = (10**4, 10**5, 10**6, 10**7)
+
+
+class _CatalogHandler(BaseHTTPRequestHandler):
+    """Serves GET /products?limit=&skip= like DummyJSON, from self.server.catalog"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/products':
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        limit = int(query.get('limit', ['30'])[0])
+        skip = int(query.get('skip', ['0'])[0])
+        catalog = self.server.catalog
+        body = json.dumps({
+            'products': catalog[skip:skip + limit],
+            'total': len(catalog),
+            'skip': skip,
+            'limit': limit,
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def mock_catalog_server(catalog):
+    """Runs a local DummyJSON stand-in on a free port; yields its base URL"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _CatalogHandler)
+    server.catalog = catalog
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _stages(modules, filename, workdir, base_url):
+    """
+    The benchmarked pipeline as (name, function) pairs
+
+    Each function takes the dict of earlier results and returns its own
+    result, so every stage is timed on the real output of the one before it.
+    The 2.x analytics run on the TransactionTable from 5.1, which they accept
+    alongside their own (lowercase-key) dict format.
+    """
+    m11, m12, m13 = modules['1.1'], modules['1.2'], modules['1.3']
+    m51 = modules['5.1']
+    catalog_file = os.path.join(workdir, 'product_catalog.json')
+
+    def fetch_catalog(r):
+        # ttl=0: always download the whole catalog from the mock server
+        cache = m51.ProductCatalogCache(catalog_file, ttl=0, base_url=base_url)
+        return m51.create_product_mapping(m51.fetch_all_products(cache))
+
+    def on_table(analysis):
+        return lambda r: analysis(r['load_transactions_table'])
+
+    return [
+        ('read_sales_data', lambda r: m11.read_sales_data(filename)),
+        ('parse_transactions', lambda r: m12.parse_transactions(r['read_sales_data'])),
+        ('validate_and_filter', lambda r: m13.validate_and_filter(r['parse_transactions'])[0]),
+        ('load_transactions_table',
+         lambda r: m51.load_transactions(filename, use_cache=False)),
+        ('calculate_total_revenue', on_table(modules['2.1'].calculate_total_revenue)),
+        ('region_wise_sales', on_table(modules['2.1 B'].region_wise_sales)),
+        ('top_selling_products', on_table(modules['2.1 C'].top_selling_products)),
+        ('customer_analysis', on_table(modules['2.1 D'].customer_analysis)),
+        ('daily_sales_trend', on_table(modules['2.2'].daily_sales_trend)),
+        ('find_peak_sales_day', on_table(modules['2.2 B'].find_peak_sales_day)),
+        ('low_performing_products', on_table(modules['2.3'].low_performing_products)),
+        ('fetch_catalog', fetch_catalog),
+        ('enrich_sales_data',
+         lambda r: m51.enrich_sales_data(r['validate_and_filter'], r['fetch_catalog'])),
+        ('save_enriched_data',
+         lambda r: modules['3.2'].save_enriched_data(
+             r['enrich_sales_data'], os.path.join(workdir, 'enriched_sales_data.txt'))),
+        ('generate_sales_report',
+         lambda r: modules['4.1'].generate_sales_report(
+             r['validate_and_filter'], r['enrich_sales_data'],
+             os.path.join(workdir, 'sales_report.txt'))),
+    ]
+
+
+def _run_pipeline(stages, trace_memory):
+    """
+    Runs every stage once
+
+    Returns:
+        dict: stage name -> seconds, or -> peak traced bytes when trace_memory
+    """
+    results = {}
+    measured = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name, func in stages:
+            gc.collect()
+            if trace_memory:
+                tracemalloc.start()
+                baseline = tracemalloc.get_traced_memory()[0]
+                results[name] = func(results)
+                measured[name] = tracemalloc.get_traced_memory()[1] - baseline
+                tracemalloc.stop()
+            else:
+                start = time.perf_counter()
+                results[name] = func(results)
+                measured[name] = time.perf_counter() - start
+    return measured
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, workdir='output/benchmarks', repeat=1, memory=True,
+                   customers=1000, products=100, regions=4, malformed=0.01, seed=42):
+    """
+    Times every pipeline stage on generated files of each size
+
+    Stage times are the best of `repeat` runs. Peak memory is taken from a
+    separate run under tracemalloc, so tracing does not inflate the timings.
+    Generated input files are kept in workdir and reused by later runs with
+    the same parameters.
+
+    Returns:
+        dict: 'meta' (environment and generator parameters) and 'runs', one per size,
+        each with stage -> {'seconds', 'rows_per_sec', 'peak_bytes'}
+    """
+    generator = load_module('6.1 py.py')
+    modules = {
+        '1.1': load_module('1.1 py.py'),
+        '1.2': load_module('1.2 py.py'),
+        '1.3': load_module('1.3 py.py'),
+        '2.1': load_module('2.1 py.py'),
+        '2.1 B': load_module('2.1 B py.py'),
+        '2.1 C': load_module('2.1 C py.py'),
+        '2.1 D': load_module('2.1 D PY.py'),
+        '2.2': load_module('2.2 py.py'),
+        '2.2 B': load_module('2.2 B py.py'),
+        '2.3': load_module('2.3 py.py'),
+        '3.2': load_module('3.2 py.py'),
+        '4.1': load_module('4.1 py.py'),
+        '5.1': load_module('5.1 py.py'),
+    }
+    os.makedirs(workdir, exist_ok=True)
+    params = {'customers': customers, 'products': products, 'regions': regions,
+              'malformed': malformed, 'seed': seed}
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'generator': params,
+        },
+        'runs': [],
+    }
+
+    with mock_catalog_server(generator.generate_catalog(products, seed)) as base_url:
+        for rows in sizes:
+            filename = os.path.join(
+                workdir, f"sales_{rows}_{customers}_{products}_{regions}_{malformed}_{seed}.txt")
+            if not os.path.exists(filename):
+                print(f"Generating {rows} rows -> '{filename}'")
+                generator.generate_sales_data(filename, rows, **params)
+
+            stages = _stages(modules, filename, workdir, base_url)
+            timings = [_run_pipeline(stages, trace_memory=False) for _ in range(repeat)]
+            peaks = _run_pipeline(stages, trace_memory=True) if memory else {}
+
+            run = {'rows': rows, 'stages': {}}
+            for name, _ in stages:
+                seconds = min(t[name] for t in timings)
+                run['stages'][name] = {
+                    'seconds': seconds,
+                    'rows_per_sec': rows / seconds if seconds else None,
+                    'peak_bytes': peaks.get(name),
+                }
+            report['runs'].append(run)
+            print_run(run)
+
+    return report
+
+
+def print_run(run, baseline=None):
+    """Print one run as a table; with a baseline run, add the speed-up per stage"""
+    print(f"\n{run['rows']:,} rows")
+    print(f"{'Stage':<26}{'Seconds':>10}{'Rows/sec':>14}{'Peak MiB':>10}"
+          + (f"{'Speed-up':>10}" if baseline else ''))
+    for name, stage in run['stages'].items():
+        peak = stage['peak_bytes']
+        line = (f"{name:<26}{stage['seconds']:>10.4f}{stage['rows_per_sec'] or 0:>14,.0f}"
+                f"{(peak / 2**20 if peak is not None else float('nan')):>10.1f}")
+        if baseline:
+            before = baseline['stages'].get(name)
+            if before and stage['seconds']:
+                line += f"{before['seconds'] / stage['seconds']:>9.2f}x"
+        print(line)
+
+
+def compare(report, baseline):
+    """Print every run of report next to the run with the same row count in baseline"""
+    previous = {run['rows']: run for run in baseline['runs']}
+    for run in report['runs']:
+        print_run(run, previous.get(run['rows']))
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every sales pipeline stage")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="row counts to benchmark (default: 10^4 to 10^7)")
+    parser.add_argument('--repeat', type=int, default=1, help="timed runs per size; the best is kept")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc run")
+    parser.add_argument('--workdir', default='output/benchmarks',
+                        help="where generated inputs and stage outputs go")
+    parser.add_argument('--output', help="results JSON (default: <workdir>/bench-<timestamp>.json)")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--regions', type=int, default=4)
+    parser.add_argument('--malformed', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    report = run_benchmarks(args.sizes, args.workdir, args.repeat, not args.no_memory,
+                            args.customers, args.products, args.regions, args.malformed, args.seed)
+    output = args.output or os.path.join(
+        args.workdir, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results saved to '{output}'")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
@@ -0,0 +1,25 @@
+"""Imports the numbered sales scripts, whose file names are not valid module names"""
+import importlib.util
+import os
+import sys
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_module(filename):
+    """
+    Imports one of the numbered scripts by file name, e.g. load_module('5.1 py.py')
+
+    Each script runs once and is registered in sys.modules, so every script
+    that loads it gets the same module, and functions defined in it can be
+    pickled (e.g. by the process pool in 5.1).
+    """
+    name = 'sales_' + ''.join(c if c.isalnum() else '_' for c in filename)
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the scripts load each other through script_loader, which expects the
+# repository root on sys.path (as it is when a script is run directly)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
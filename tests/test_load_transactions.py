@@ -0,0 +1,46 @@
+import pytest
+
+from script_loader import load_module
+
+sales = load_module('5.1 py.py')
+generator = load_module('6.1 py.py')
+
+
+@pytest.fixture
+def sales_file(tmp_path):
+    filename = str(tmp_path / 'sales_data.txt')
+    generator.generate_sales_data(filename, rows=5000, customers=200, malformed=0.02)
+    return filename
+
+
+def make_filter():
+    return sales.TransactionFilter(min_amount=50000, end_date='2024-12-25', customer_prefix='C0001')
+
+
+def load_twice(filename, **kwargs):
+    """Load filename twice through one reused filter; return the tables and the filter"""
+    row_filter = make_filter()
+    tables = [sales.load_transactions(filename, row_filter=row_filter, **kwargs) for _ in range(2)]
+    return [list(table.rows()) for table in tables], row_filter
+
+
+def counts(row_filter):
+    return row_filter.summary(), sorted(row_filter.regions), row_filter.amount_range
+
+
+def test_reused_filter_counts_match_across_load_paths(sales_file):
+    once = make_filter()
+    sales.load_transactions(sales_file, row_filter=once, use_cache=False)
+    serial_rows, serial = load_twice(sales_file, use_cache=False)
+    pool_rows, pool = load_twice(sales_file, workers=2, use_cache=False)
+    info = {}
+    cached_rows, cached = load_twice(sales_file, info=info)
+
+    assert info['cache'] == 'hit'
+    summary = serial.summary()
+    assert summary['total_input'] == 2 * once.summary()['total_input']
+    assert 0 < summary['final_count'] < summary['total_input'] - summary['invalid']
+    assert counts(pool) == counts(serial)
+    assert counts(cached) == counts(serial)
+    assert pool_rows == serial_rows
+    assert cached_rows == serial_rows
@@ -0,0 +1,83 @@
+import os
+
+from script_loader import load_module
+
+sales = load_module('5.1 py.py')
+
+HEADER = 'TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n'
+REGIONS = ['North', 'South', 'East', 'West']
+
+
+def rows(start, count):
+    # whole-number amounts, so totals do not depend on the order they are summed in
+    return ''.join(
+        f"T{i:05d}|2024-12-{i % 28 + 1:02d}|P{101 + i % 7}|Product {101 + i % 7}|"
+        f"{i % 5 + 1}|{i % 9 * 10 + 10}|C{i % 13:03d}|{REGIONS[i % 4]}\n"
+        for i in range(start, start + count))
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(text)
+
+
+def poll(service):
+    service.apply(*service.poll())
+
+
+def customers(aggregates):
+    return {cid: dict(data, products_bought=sorted(data['products_bought']))
+            for cid, data in aggregates.top_customers(100).items()}
+
+
+def assert_matches_batch(service, source):
+    batch, _, kept, _ = sales.ingest_files(source, workers=1, use_cache=False)
+    totals = service.totals()
+    assert service.status()['rows'] == kept
+    assert totals.region_wise_sales() == batch.region_wise_sales()
+    assert totals.top_selling_products(100) == batch.top_selling_products(100)
+    assert customers(totals) == customers(batch)
+    assert service.daily() == {day: {'revenue': data['revenue'], 'transactions': data['transactions'],
+                                     'unique_customers': len(data['customers'])}
+                               for day, data in sorted(batch.daily.items())}
+
+
+def test_shrink_then_rotate_then_query(tmp_path):
+    first, second = tmp_path / 'a.txt', tmp_path / 'b.txt'
+    write(first, HEADER + rows(0, 40))
+    write(second, HEADER + rows(100, 30))
+    service = sales.SalesTailService(str(tmp_path))
+    poll(service)
+    write(first, rows(40, 10), 'a')
+    poll(service)
+    assert service.status()['rows'] == 80
+    assert_matches_batch(service, str(tmp_path))
+
+    # truncated and rewritten shorter: parsed again from the start
+    write(first, HEADER + rows(200, 5))
+    poll(service)
+    assert_matches_batch(service, str(tmp_path))
+
+    # rotated: a new file (new inode) moved over the old name
+    rotated = tmp_path / 'b.txt.new'
+    write(rotated, HEADER + rows(300, 12))
+    os.replace(rotated, second)
+    poll(service)
+    assert service.status()['rows'] == 17
+    assert_matches_batch(service, str(tmp_path))
+
+    status, body = service.route('/summary', {'n': ['3']})
+    assert status == '200 OK'
+    assert body['regions'] == service.totals().region_wise_sales()
+    assert body['status']['files'] == 2
+
+
+def test_removed_file_is_dropped(tmp_path):
+    write(tmp_path / 'a.txt', HEADER + rows(0, 20))
+    write(tmp_path / 'b.txt', HEADER + rows(50, 20))
+    service = sales.SalesTailService(str(tmp_path))
+    poll(service)
+    os.remove(tmp_path / 'b.txt')
+    poll(service)
+    assert set(service.partials) == {str(tmp_path / 'a.txt')}
+    assert_matches_batch(service, str(tmp_path))